@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# Copyright 2025 ncsuandrew12
+# Modifications Copyright to their individual contributors
+# Licensed under the Open Software License version 3.0
+# SPDX-License-Identifier: OSL-3.0
+"""
+Theoryland Interview Database Benchmark
+
+This script measures the performance of each stage of convert_all_interviews.py
+against a synthetic corpus, so that changes to the converter can be compared
+across commits without the real (unpublished) raw HTML corpus.
+
+The benchmark:
+1. Generates synthetic raw HTML pages with the same structure as Theoryland
+   interview pages (main body column, summary fields, links, entry list with
+   entry numbers, entry data and tag forms), with varied entry counts and sizes
+2. Times each stage of the converter over the corpus: normalize, parse (from
+   normalized files), parse (direct from raw files), markdownify, JSON archive,
+   Markdown write and MediaWiki template write
+3. Records wall time, CPU time, throughput and peak memory per stage
+4. Writes a JSON report, and optionally compares it against an earlier report
+
+Dependencies:
+    - beautifulsoup4, markdownify: Required by convert_all_interviews.py
+
+Author: ncsuandrew12
+License: OSSL-3.0
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from datetime import datetime, timezone
+from pathlib import Path
+from bs4 import BeautifulSoup
+
+import convert_all_interviews as tidbc
+
+SPEAKERS = ["Robert Jordan", "Brandon Sanderson", "Harriet McDougal", "Maria Simons", "Question", "Footnote"]
+TAGS = ["rand", "mat", "perrin", "egwene", "nynaeve", "the dark one", "balefire", "forsaken", "ta'veren", "aes sedai", "asha'man", "seanchan"]
+TYPES = ["Verbatim", "Paraphrased", "Book Signing", "Chat", "Interview", "Q&A", "Tweet"]
+LOCATIONS = ["Atlanta, GA", "New York, NY", "Charleston, SC", "London, UK", "Orem, UT", None]
+TOURS = ["Knife of Dreams Tour", "The Gathering Storm Tour", "JordanCon 2010", "Dragon*Con 2007", None]
+REPORTERS = ["Aaron Bergman", "Terez", "Linda", "Jason Denzel", "Matt Hatch", None]
+WORDS = ("the a of and to in that is was he for it with as his on be at by had not are but from or have an they which one you were all "
+         "her she there would their we him been has when who will more no if out so said what up its about into than them can only other "
+         "channel saidar saidin weave gateway wolf dream tel'aran'rhiod sword horn prophecy pattern dragon wheel age last battle").split()
+
+def generate_page(rng, interview_id, max_entries):
+    """
+    Generate one synthetic Theoryland interview page.
+
+    Args:
+        rng (random.Random): Random number generator
+        interview_id (int): Interview id, used in the title and entry text
+        max_entries (int): Maximum number of entries in the page
+
+    Returns:
+        str: Raw HTML of the page
+    """
+    entries = []
+    # Most interviews are short, a few are very long
+    entry_count = min(max_entries, max(1, int(rng.paretovariate(1.2))))
+    for entry_i in range(1, entry_count + 1):
+        body = []
+        for _ in range(rng.randint(1, 6)):
+            words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 120)))
+            extra = rng.choice(["", f" <em>{rng.choice(WORDS)}</em>", f' <a href="https://example.com/{rng.randint(1, 999)}">{rng.choice(WORDS)}</a>', " <strong>RAFO</strong>"])
+            body.append(f"<h4>{rng.choice(SPEAKERS)}</h4>\n<p>{words}{extra}.</p>\n")
+        tags = rng.sample(TAGS, rng.randint(0, 4))
+        tag_forms = ",\n".join(f'<form action="search.php" method="post"><input type="hidden" name="t" value="{t}"/><button class="lk-search-tag" type="submit">{t}</button></form>' for t in tags)
+        tag_block = f"<h4>Tags</h4>\n<div>\n{tag_forms}\n</div>\n" if tags else ""
+        entries.append(f'<li>\n<a name="{entry_i}"></a>\n<div class="entry-num">\n<p>{entry_i}</p>\n</div>\n<div class="entry-data">\n{"".join(body)}{tag_block}</div>\n</li>\n')
+    fields = f"<h4>Entries</h4>\n<p>{entry_count}</p>\n"
+    year = rng.randint(1990, 2013)
+    date = rng.choice([f"{rng.choice(['Jan', 'Mar', 'Jun', 'Oct'])} {rng.randint(1, 28)}th, {year}", f"Mar, {year}", f"{year}", None])
+    if date:
+        fields += f"<h4>Date</h4>\n<p>{date}</p>\n"
+    fields += f"<h4>Type</h4>\n<p>{rng.choice(TYPES).replace('&', '&amp;')}</p>\n"
+    for name, values in [("Location", LOCATIONS), ("Bookstore", ["Borders", "B&amp;N", None, None]), ("TourCon", TOURS), ("Reporter", REPORTERS)]:
+        value = rng.choice(values)
+        if value:
+            fields += f"<h4>{name}</h4>\n<p>{value}</p>\n"
+    if rng.random() < 0.6:
+        links = "".join(f'<p><a href="https://example.com/source/{interview_id}/{k}">source {k}</a></p>\n' for k in range(rng.randint(1, 3)))
+        fields += f"<h4>Links</h4>\n{links}"
+    title = f"{rng.choice(['Signing Report', 'AOL Chat', 'Twitter', 'Letter to a Fan', 'Convention Q&amp;A'])} {interview_id}"
+    chrome = "".join(f'<li><a href="/page{k}.php">Menu item {k}</a></li>' for k in range(200))
+    return f'''<!DOCTYPE html>
+<html><head><title>Theoryland - Interview {interview_id}</title><script>var x = 1;</script></head>
+<body><div class="header"><ul class="menu">{chrome}</ul></div>
+<div class="body-column-main">
+<div class="col-container">
+<div class="col-content">
+<div class="intv-nav"><a href="intvmain.php?i={interview_id - 1}">Previous</a></div>
+<div style="position:relative;">
+<h3><a href="listintv.php">Interviews</a>: {title}</h3>
+<div class="intv-summary">
+<h3>Summary</h3>
+{fields}</div>
+<div class="intv-entry-list">
+<ul>
+{"".join(entries)}</ul>
+</div>
+</div>
+</div>
+</div>
+</div>
+<div class="footer">{chrome}&#8232;</div></body></html>
+'''
+
+def generate_corpus(raw_dir, size, max_entries, seed):
+    """
+    Write a synthetic corpus of raw interview pages.
+
+    Args:
+        raw_dir (Path): Directory to write the pages to
+        size (int): Number of interviews to generate
+        max_entries (int): Maximum number of entries per interview
+        seed (int): Seed for the random number generator, so corpora are reproducible
+
+    Returns:
+        list[Path]: The generated files, in id order
+    """
+    rng = random.Random(seed)
+    os.makedirs(raw_dir, exist_ok=True)
+    files = []
+    for interview_id in range(1, size + 1):
+        path = Path(raw_dir) / f"{interview_id}.html"
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(generate_page(rng, interview_id, max_entries))
+        files.append(path)
+    return files
+
+class StageTimer:
+    """
+    Measures the wall time, CPU time and peak memory of one benchmark stage.
+
+    Attributes:
+        name (str): Stage name
+        items (int): Number of items processed, for throughput
+        nbytes (int): Number of input bytes processed, for throughput
+        trace_memory (bool): Whether to measure peak Python heap use with tracemalloc
+        result (dict): Measurements, available after the stage finishes
+        wall (float): perf_counter() value when the stage started
+        cpu (float): process_time() value when the stage started
+    """
+    name = None
+    items = None
+    nbytes = None
+    trace_memory = None
+    result = None
+    wall = None
+    cpu = None
+
+    def __init__(self, name, items, nbytes, trace_memory):
+        """
+        Initialize a StageTimer.
+
+        Args:
+            name (str): Stage name
+            items (int): Number of items processed, for throughput
+            nbytes (int): Number of input bytes processed, or None
+            trace_memory (bool): Whether to measure peak Python heap use with tracemalloc
+        """
+        self.name = name
+        self.items = items
+        self.nbytes = nbytes
+        self.trace_memory = trace_memory
+
+    def __enter__(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        peak = None
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.result = {
+            "wallSeconds": wall,
+            "cpuSeconds": cpu,
+            "items": self.items,
+            "itemsPerSecond": self.items / wall if wall > 0 else None,
+            "megabytesPerSecond": self.nbytes / wall / 1e6 if wall > 0 and self.nbytes else None,
+            "peakTracedBytes": peak,
+            "maxRssBytes": max_rss_bytes(),
+        }
+
+def max_rss_bytes():
+    """
+    Get the peak resident set size of this process so far.
+
+    Returns:
+        int: Peak RSS in bytes
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+def git_commit():
+    """
+    Get the current git commit of the repository, if available.
+
+    Returns:
+        str: Commit hash, or None if git is unavailable
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(args, work_dir):
+    """
+    Generate the corpus and time every converter stage over it.
+
+    Args:
+        args: Command line arguments object containing configuration
+        work_dir (Path): Scratch directory for the corpus and outputs
+
+    Returns:
+        dict: Stage name to the measurements of the fastest repetition
+    """
+    raw_dir = work_dir / "raw"
+    norm_dir = work_dir / "normalized"
+    out_dir = work_dir / "out"
+    for d in (norm_dir, out_dir):
+        os.makedirs(d, exist_ok=True)
+    start = time.perf_counter()
+    raw_files = generate_corpus(raw_dir, args.size, args.max_entries, args.seed)
+    raw_bytes = sum(f.stat().st_size for f in raw_files)
+    print(f"Generated {len(raw_files)} pages ({raw_bytes / 1e6:.1f} MB) in {time.perf_counter() - start:.2f}s")
+    conv_args = argparse.Namespace(normalize_dir=str(norm_dir), output_dir=str(out_dir), html_parser=args.html_parser,
+                                   mw_template_path=str(out_dir / "template.template"))
+    direct_args = argparse.Namespace(**vars(conv_args))
+    direct_args.normalize_dir = None
+    best = {}
+
+    def stage(name, items, nbytes, func, setup=None):
+        for _ in range(args.repeat):
+            if setup:
+                setup()
+            with StageTimer(name, items, nbytes, args.trace_memory) as timer:
+                func()
+            if name not in best or timer.result["wallSeconds"] < best[name]["wallSeconds"]:
+                best[name] = timer.result
+        r = best[name]
+        print(f"  {name:<16} {r['wallSeconds']:8.3f}s wall {r['cpuSeconds']:8.3f}s cpu {r['itemsPerSecond'] or 0:10.1f} items/s")
+
+    stage("normalize", len(raw_files), raw_bytes, lambda: [tidbc.normalize_raw_html(conv_args, f) for f in raw_files])
+    norm_files = [norm_dir / f.name for f in raw_files]
+    norm_bytes = sum(f.stat().st_size for f in norm_files)
+    interviews = {}
+
+    def parse():
+        interviews.clear()
+        for f in norm_files:
+            interview = tidbc.process_html(conv_args, f)
+            interviews[str(interview.id)] = interview
+    stage("parse", len(norm_files), norm_bytes, parse)
+    stage("parse_direct", len(raw_files), raw_bytes, lambda: [tidbc.process_raw_html(direct_args, f) for f in raw_files])
+    entry_divs = []
+    for f in norm_files:
+        with open(f, 'r', encoding='utf-8') as fh:
+            soup = BeautifulSoup(fh.read(), 'html.parser')
+        entry_divs.extend(soup.find_all('div', class_='entry-data'))
+    stage("markdownify", len(entry_divs), None, lambda: [tidbc.markdown_converter.convert_tag(div) for div in entry_divs])
+    entry_count = sum(len(i.entries) for i in interviews.values())
+
+    def fresh_output_dir():
+        # The converter skips files that are already up to date, so every repetition must write from scratch
+        shutil.rmtree(out_dir)
+        os.makedirs(out_dir)
+    stage("json_archive", len(interviews), None,
+          lambda: tidbc.write_json_archive(out_dir / "archive.json", out_dir / "archive.offsets.json", interviews), fresh_output_dir)
+
+    def markdown_write():
+        with open(out_dir / "archive.md", 'w', encoding='utf-8') as m:
+            for i in range(1, len(interviews) + 1):
+                rendered = tidbc.RenderedInterview(interviews[str(i)], "footer")
+                m.write(rendered.combined)
+                rendered.write_pages(str(out_dir))
+    stage("markdown_write", len(interviews) + entry_count, None, markdown_write, fresh_output_dir)
+    stage("template_write", len(interviews), None, lambda: tidbc.write_mw_template(conv_args, interviews), fresh_output_dir)
+    return best
+
+def compare_reports(old, new):
+    """
+    Print the change in wall time of every stage between two reports.
+
+    Args:
+        old (dict): Earlier benchmark report
+        new (dict): Current benchmark report
+    """
+    print(f"Comparison against {old.get('commit') or 'previous report'} ({old['corpus']['size']} pages):")
+    for name, result in new["stages"].items():
+        if name not in old["stages"]:
+            print(f"  {name:<16} (new stage)")
+            continue
+        before = old["stages"][name]["wallSeconds"]
+        after = result["wallSeconds"]
+        print(f"  {name:<16} {before:8.3f}s -> {after:8.3f}s ({before / after if after else float('inf'):.2f}x)")
+
+def main():
+    """
+    Main entry point for the benchmark script.
+
+    Parses command line arguments, runs the benchmark in a scratch directory,
+    and writes the JSON report.
+    """
+    parser = argparse.ArgumentParser(prog=__name__,
+                                     description="Benchmark each stage of convert_all_interviews.py against a synthetic Theoryland corpus.")
+    parser.add_argument('-n', '--size', type=int, help='Number of synthetic interviews to generate', default=200)
+    parser.add_argument('-e', '--max-entries', type=int, help='Maximum number of entries per interview', default=100)
+    parser.add_argument('-s', '--seed', type=int, help='Random seed for the synthetic corpus', default=1184)
+    parser.add_argument('-r', '--repeat', type=int, help='Number of times to run each stage; the fastest run is reported', default=1)
+    parser.add_argument('-m', '--trace-memory', action='store_true', help='Measure the peak Python heap use of each stage with tracemalloc (slows every stage down)')
+    parser.add_argument('-p', '--html-parser', type=str, choices=['html.parser', 'lxml'], help='BeautifulSoup parser to use for the direct parse stage', default='html.parser')
+    parser.add_argument('-w', '--work-dir', type=str, help='Directory for the corpus and outputs (defaults to a temporary directory that is removed afterwards)')
+    parser.add_argument('-o', '--report-path', type=str, help='Path to write the JSON report to', default="benchmark-report.json")
+    parser.add_argument('-c', '--compare', type=str, help='Path to an earlier report to compare against')
+    args = parser.parse_args()
+    tidbc.logger.setLevel(logging.WARNING)
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+        stages = run_benchmark(args, Path(args.work_dir))
+    else:
+        with tempfile.TemporaryDirectory(prefix="tidb-bench-") as work_dir:
+            stages = run_benchmark(args, Path(work_dir))
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": {"size": args.size, "maxEntries": args.max_entries, "seed": args.seed},
+        "repeat": args.repeat,
+        "htmlParser": args.html_parser,
+        "traceMemory": args.trace_memory,
+        "stages": stages,
+    }
+    with open(args.report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote benchmark report to {args.report_path}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare_reports(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
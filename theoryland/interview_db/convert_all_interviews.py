@@ -11,32 +11,59 @@ them into structured JSON and Markdown formats.
 
 The script performs three main operations:
 1. Normalizes raw HTML files for consistent formatting
-2. Parses the normalized HTML to extract structured interview data
+2. Parses the normalized HTML to extract structured interview data (or, in
+   direct mode, parses and normalizes each raw HTML file in memory)
 3. Generates JSON and Markdown output files
 
 Dependencies:
     - beautifulsoup4: For HTML parsing and normalization
     - markdownify: For converting HTML content to Markdown
+    - lxml (optional): Faster HTML parser for raw files in direct mode
+    - brotli (optional): For .br precompressed copies of the aggregate files
 
 Author: ncsuandrew12
 License: OSSL-3.0
 """
 
 import argparse
+import cProfile
+import ctypes
+import ctypes.util
+import difflib
+import gzip
+import hashlib
+import io
 import json
 import logging
 import os
+import pickle
 import re
+import select
+import sqlite3
+import struct
 import sys
+import threading
+import time
+import traceback
+import unicodedata
+import zlib
 
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
+from bs4.element import PreformattedString
+from markdownify import MarkdownConverter
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 logger = logging.getLogger("tidbc")
-logging.basicConfig(filename='tidbc.log', level=logging.INFO)
-logger.addHandler(logging.StreamHandler(sys.stdout))
 
 class SummaryField:
     """
@@ -85,6 +112,10 @@ class Interview:
     
     This class contains all the structured data for a single interview,
     including metadata and a list of interview entries.
+
+    The class uses __slots__ so that a full corpus (and several corpus
+    snapshots in one process) stays compact, and serializes itself through
+    toDict() rather than the generic JsonEncoder fallback.
     
     Attributes:
         id (int): Unique identifier for the interview
@@ -99,23 +130,72 @@ class Interview:
         reporter (str): Name of the person who conducted/reported the interview
         links (list): Related links for the interview
     """
-    id = None
-    title = None
-    entries = None
-    entryCount = None
-    date = None
-    entryType = None
-    location = None
-    bookStore = None
-    tourCon = None
-    reporter = None
-    links = None
+    __slots__ = ('id', 'title', 'entryCount', 'date', 'entryType', 'location', 'bookStore', 'tourCon',
+                 'reporter', 'links', 'entries')
+    # Fields written even when unset; the others are omitted from the JSON when None
+    requiredKeys = frozenset(('id', 'entryCount', 'date', 'entries'))
+    # Keys written by older versions of this script
+    legacyKeys = {'bookstore': 'bookStore', 'tourcon': 'tourCon'}
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, None)
     
     def __str__(self):
         return f"Interview: {self.toJSON()}"
         
     def toJSON(self):
-        return json.dumps(self.__dict__, cls=JsonEncoder)
+        return json.dumps(self.toDict())
+
+    def toDict(self):
+        """
+        Convert the interview to plain JSON-serializable data.
+
+        Keys are written in __slots__ order, so the output does not depend on
+        the order in which the parser happened to set the attributes.
+
+        Returns:
+            dict: The interview, with its date formatted and its entries converted
+        """
+        result = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is None:
+                if name in self.requiredKeys:
+                    result[name] = None
+                continue
+            if name == 'date':
+                value = value.strftime('%Y-%m-%d')
+            elif name == 'entries':
+                value = [entry.toDict() for entry in value]
+            result[name] = value
+        return result
+
+    @classmethod
+    def fromJSON(cls, data):
+        """
+        Rebuild an Interview from its decoded JSON representation.
+
+        Args:
+            data (dict): An interview object as written by toDict()
+
+        Returns:
+            Interview: The interview, with its date and entries restored
+
+        Raises:
+            RuntimeError: If the data contains a key that is not an interview field
+        """
+        result = cls()
+        for k, v in data.items():
+            k = cls.legacyKeys.get(k, k)
+            if k not in cls.__slots__:
+                raise RuntimeError(f"Unknown interview field in JSON: {k}")
+            setattr(result, k, v)
+        if result.date:
+            result.date = datetime.strptime(result.date, '%Y-%m-%d')
+        if result.entries is not None:
+            result.entries = [InterviewEntry.fromJSON(entry) for entry in result.entries]
+        return result
 
 class InterviewEntry:
     """
@@ -128,14 +208,41 @@ class InterviewEntry:
         content (str): The entry content converted to Markdown format
         tags (list[str]): List of tags associated with this entry
     """
-    content = None
-    # tags = []
+    __slots__ = ('content', 'tags')
+
+    def __init__(self, content=None, tags=None):
+        self.content = content
+        self.tags = tags if tags is not None else []
     
     def __str__(self):
         return f"InterviewEntry: {self.toJSON()}"
         
     def toJSON(self):
-        return json.dumps(self.__dict__, cls=JsonEncoder)
+        return json.dumps(self.toDict())
+
+    def toDict(self):
+        """
+        Convert the entry to plain JSON-serializable data.
+
+        Returns:
+            dict: The entry; tags are omitted when there are none
+        """
+        if self.tags:
+            return {"content": self.content, "tags": self.tags}
+        return {"content": self.content}
+
+    @classmethod
+    def fromJSON(cls, data):
+        """
+        Rebuild an InterviewEntry from its decoded JSON representation.
+
+        Args:
+            data (dict): An entry object as written by toDict()
+
+        Returns:
+            InterviewEntry: The entry
+        """
+        return cls(data.get('content'), data.get('tags'))
 
 class JsonEncoder(json.JSONEncoder):
     """
@@ -143,7 +250,8 @@ class JsonEncoder(json.JSONEncoder):
     
     This encoder handles the conversion of custom classes (SummaryField,
     Interview, InterviewEntry) and datetime objects to JSON-serializable
-    formats.
+    formats. Bulk writers should serialize Interview.toDict() directly
+    instead, which avoids the per-object fallback into default().
     """
     def default(self, o):
         """
@@ -155,252 +263,2927 @@ class JsonEncoder(json.JSONEncoder):
         Returns:
             JSON-serializable representation of the object
         """
-        if isinstance(o, SummaryField) or isinstance(o, Interview) or isinstance(o, InterviewEntry):
+        if isinstance(o, Interview) or isinstance(o, InterviewEntry):
+            return o.toDict()
+        if isinstance(o, SummaryField):
             return o.__dict__
         if isinstance(o, datetime):
             return datetime.strftime(o, '%Y-%m-%d')
         return super().default(o)
 
-def main():
+class EntryMarkdownConverter(MarkdownConverter):
     """
-    Main entry point for the HTML processing script.
-    
-    This function orchestrates the complete processing pipeline:
-    1. Parses command line arguments
-    2. Optionally normalizes raw HTML files
-    3. Processes normalized HTML files to extract structured data
-    4. Generates JSON output with all interview data
-    5. Optionally generates Markdown files for documentation
-    6. Optionally creates MediaWiki template for citations
-    
-    The function handles the workflow logic, determining what steps to execute
-    based on command line flags and the presence of existing files.
+    Markdown converter that works directly on an already-parsed tag.
+
+    markdownify() serializes its input and parses it again into a new soup
+    before converting it. Entry content is already parsed, so convert_tag()
+    walks the tag in place and applies the same document-level formatting
+    markdownify() would, producing identical output without the second parse.
     """
-    parser = argparse.ArgumentParser(prog=__name__,
-                                     description="Process raw HTML files from Theoryland Interview Database and translate them into more locally useful forms.")
-    parser.add_argument('-r', '--raw-html-dir', type=str, help='Directory containing raw HTML files')
-    parser.add_argument('-o', '--output-dir', type=str, help='Directory to save processed output files', default="../../docs/theoryland/interviews")
-    parser.add_argument('-n', '--normalize', action='store_true', help='Normalize raw HTML files even if normalized files are present')
-    parser.add_argument('-z', '--normalize-dir', type=str, help='Directory containing normalized HTML files')
-    parser.add_argument('-j', '--load-json', action='store_true', help='(Not yet working) Load from existing JSON file instead of loading from normalized HTML files. Skips processing of raw and normalized HTML files')
-    parser.add_argument('-k', '--skip-markdown', action='store_true', help='Skip generating Markdown files from the processed interviews')
-    parser.add_argument('-t', '--mw-template-path', type=str, help='Path to the Mediawiki template for converting from id to citation description', default="./processed/mediawiki-template-tidb-switch.template")
-    parser.add_argument('-l', '--log-level', type=int, help='Set the logging level')
-    args = parser.parse_args()
-    if args.log_level:
-        logger.setLevel(args.log_level)
-        print(f"Log level set to {args.log_level}")
-    html_dir = Path(args.raw_html_dir)
-    basename = "theoryland interview database"
-    md_footer = f"## Contributing\n\n*If you are viewing this on github.io, you can see that this site is open source. Please do not try to improve this page. It is auto-generated by a python script. If you have suggestions for improvements, please start a discussion on [the github repo](https://source.wot.wiki) or [the Discord](https://discord.wot.wiki).*"
-    normalize = args.normalize
-    if args.load_json:
-        normalize = False
-    elif not normalize:
-        p = Path(args.normalize_dir)
-        normalized_files = list(p.glob("*.html")) + list(p.glob("*.htm"))
-        normalize = len(normalized_files) == 0
-    if normalize:
-        logger.info(f"Checking for raw HTML files in directory: {html_dir}")
-        if not html_dir.exists():
-            raise FileNotFoundError(f"Directory not found: {html_dir}")
-        logger.info(f"Globbing HTML files in {html_dir}")
-        html_files = list(html_dir.glob("*.html")) + list(html_dir.glob("*.htm"))
-        if not html_files:
-            logger.warning(f"No HTML files found in {html_dir}")
-            return
-        msg = f"Processing {len(html_files)} raw HTML files"
-        logger.info(msg)
-        if not logger.isEnabledFor(logging.DEBUG):
-            print(msg, end='', flush=True)
-        i = 0
-        for f in html_files:
-            normalize_raw_html(args, f)
-            i += 1
-            if not logger.isEnabledFor(logging.DEBUG) and i % 5 == 0:
-                print(".", end='', flush=True)
-        if not logger.isEnabledFor(logging.DEBUG):
-            print("")
-        p = Path(args.normalize_dir)
-        normalized_files = list(p.glob("*.html")) + list(p.glob("*.htm"))
-    json_path = Path(f"{args.output_dir}/{basename}.json")
-    interviews = {}
-    if not args.load_json:
-        msg = f"Processing {len(normalized_files)} normalized HTML files"
-        logger.info(msg)
-        if not logger.isEnabledFor(logging.DEBUG):
-            print(msg, end='', flush=True)
-        for f in normalized_files:
-            interview = process_html(args, f)
-            interviews[str(interview.id)] = interview
-            if not logger.isEnabledFor(logging.DEBUG) and len(interviews) % 5 == 0:
-                print(".", end='', flush=True)
-        if not logger.isEnabledFor(logging.DEBUG):
-            print("")
-        with open(json_path, 'w', encoding='utf-8') as f:
-            logger.info(f"Writing JSON to {f.name}")
-            f.write(json.dumps(interviews, cls=JsonEncoder, indent=2))
-    # TODO Use beautifulsoup to convert our objects to HTML and compare against the (normalized) original HTML
-    # as a verification of proper parsing.
-    # with open(json_path, 'r', encoding='utf-8') as f:
-    #     logger.info(f"Reading JSON from {f.name}")
-    #     interviews = json.load(f)
-    if not args.skip_markdown:
-        with open(f"{args.output_dir}/theoryland interview database.md", 'w', encoding='utf-8') as m:
-            msg = f"Writing Markdown to {m.name} and {args.output_dir}/t-*.md"
-            logger.info(msg)
-            if not logger.isEnabledFor(logging.DEBUG):
-                print(msg, end='', flush=True)
-            for i in range(1, len(interviews)+1):
-                if not logger.isEnabledFor(logging.DEBUG) and i % 5 == 0:
-                    print(".", end='', flush=True)
-                with open(f"{args.output_dir}/t-{i}.md", 'w', encoding='utf-8') as p:
-                    logger.debug(f"Writing interview Markdown to {p.name}")
-                    interview = interviews[str(i)]
-                    for f in [[m, "#"], [p, ""]]:
-                        f[0].write(f"{f[1]}# [Interview #{interview.id}" + (f": {interview.title}" if interview.title else "") + f"](https://www.theoryland.com/intvmain.php?i={i})\n\n")
-                        f[0].write(f"{f[1]}## Summary\n\n")
-                    for f in [m, p]:
-                        if interview.date:
-                            f.write(f"- Date: {datetime.strftime(interview.date, '%Y-%m-%d')}\n\n")
-                        if interview.entryType:
-                            f.write(f"- Type: {interview.entryType}\n\n")
-                        if interview.location:
-                            f.write(f"- Location: {interview.location}\n\n")
-                        if interview.bookStore:
-                            f.write(f"- Bookstore: {interview.bookStore}\n\n")
-                        if interview.tourCon:
-                            f.write(f"- Tour/Con: {interview.tourCon}\n\n")
-                        if interview.reporter:
-                            f.write(f"- Reporter: {interview.reporter}\n\n")
-                    if interview.links and len(interview.links) > 0:
-                        p.write(f"### Links\n\n")
-                        m.write(f"- Links:")
-                        for link in interview.links:
-                            p.write(f"- [" + (link['text'] if link['text'] else link['href']) + f"]({link['href']})\n\n")
-                            m.write(f" [" + (link['text'] if link['text'] else link['href']) + f"]({link['href']})\n\n")
-                        p.write("\n")
-                        m.write("\n\n")
-                    entry_i = 0
-                    for entry in interview.entries:
-                        entry_i += 1
-                        ep = Path(f"{args.output_dir}/t-{i}/{entry_i}.md")
-                        os.makedirs(ep.parent, exist_ok=True)
-                        with open(ep, 'w', encoding='utf-8') as e:
-                            logger.debug(f"Writing entry Markdown to {e.name}")
-                            e.write(f"# [Interview #{interview.id}" + (f": {interview.title}" if interview.title else "") + f", Entry #{entry_i}](https://www.theoryland.com/intvmain.php?i={i}#{entry_i})\n\n")
-                            e.write(entry.content + "\n\n")
-                            e.write(md_footer)
-                        for f in [m, p]:
-                            f.write(f"## [Entry #{entry_i}](./t-{i}/{entry_i})\n\n")
-                            f.write(entry.content + "\n\n")
-                    for f in [m, p]:
-                        f.write("\n---\n\n")
-                    p.write(md_footer)
-            m.write(md_footer)
-            if not logger.isEnabledFor(logging.DEBUG):
-                print("")
-        with open(f"{args.output_dir}/index.md", 'w', encoding='utf-8') as f:
-            logger.info(f"Writing interview index file to {f.name}")
-            f.write("# [Theoryland Interview Database](https://www.theoryland.com/listintv.php)\n\n")
-            f.write("This copy of the [Theoryland Interview Database](https://www.theoryland.com/listintv.php) is better suited for simple text searches and machine processing than the original. The original is more convenient for simple searches and has a bit of a prettier look.\n\n")
-            f.write("All copyrights and licenses for the interviews belong to Theoryland or their original authors. We are not affiliated with Theoryland in any way.\n\n")
-            f.write("## Downloads\n\n")
-            f.write(f"* Full archive [JSON](./{basename}.json)\n\n")
-            f.write(f"* Full archive [Markdown](./{basename}.md)\n\n")
-            f.write("## Interviews\n\n")
-            for i in range(1, len(interviews)+1):
-                f.write(f"- [Interview #{i}" + (f": {interviews[str(i)].title}" if interviews[str(i)].title else "") + f"](./t-{i})" + "\n")
-            f.write(md_footer)
-    if args.mw_template_path:
-        os.makedirs(os.path.dirname(args.mw_template_path), exist_ok=True)
-        with open(args.mw_template_path, 'w', encoding='utf-8') as f:
-            logger.info(f"Writing id-to-description mediawiki template switch code to {f.name}")
-            f.write('<includeonly>{{TLlink|https://www.theoryland.com/intvmain.php?i&equals;{{{1}}}{{#if:{{{2|}}}|&#35;{{{2}}}}}|{{#if:{{{3|}}}|{{{3}}}|{{#switch:{{{1|}}}\n')
-            ids = []
-            for i in interviews.values():
-                ids.append(i.id)
-            ids.sort()
-            missing = 0
-            for id in ids:
-                interview = interviews[str(id)]
-                if not (interview.title or interview.date):
-                    missing = missing + 1
-                    continue
-                title = interview.title
-                if title is None:
-                    title = interview.id
-                line = f"  | {interview.id}={title}" + (f", {{{{Date|{datetime.strftime(interview.date, '%Y %b %d')}}}}}" if interview.date else "")
-                f.write(line + "\n")
-            f.write("""  | Theoryland Interview &#35;{{{1}}}}}}}{{#if:{{{2|}}}|&nbsp;- Q{{{2}}}}}}}</includeonly><noinclude>{{Documentation}}
-[[Category:Utility templates]]</noinclude>\n""")
-            logger.info(f"  Skipped {missing} entries with no title and no date")
+    def convert_tag(self, tag):
+        """
+        Convert a tag and its contents to Markdown.
 
-def normalize_raw_html(args, file):
+        Args:
+            tag (Tag): The tag to convert; it is not modified
+
+        Returns:
+            str: The Markdown for the tag, as markdownify(str(tag)) would return it
+        """
+        # markdownify() converts the tag as the only child of a "[document]" root
+        parent_tags = {'[document]'}
+        text = self.process_tag(tag, parent_tags=parent_tags)
+        return self.convert__document_(tag, text, parent_tags=set())
+
+# Created once per process and reused for every entry
+markdown_converter = EntryMarkdownConverter()
+
+class BuildCache:
     """
-    Normalize a raw HTML file using BeautifulSoup's prettify function.
-    
-    This function takes a raw HTML file and creates a normalized version
-    with consistent formatting and structure. The normalized files are
-    easier to parse reliably in subsequent processing steps.
-    
+    Persistent build manifest used to skip work for unchanged interviews.
+
+    The manifest records the hash of every raw and normalized HTML file that has
+    been processed, the Interview parsed from each normalized file, and a key
+    for each generated output file describing the inputs it was built from.
+    The whole manifest is discarded whenever this script changes, since any
+    change to the parser or the writers may change the output.
+
+    Attributes:
+        path (Path): Location of the manifest file
+        version (str): Hash of the script that produced the manifest
+        raw (dict): Raw HTML file name to content hash
+        parsed (dict): Normalized HTML file name to (content hash, Interview)
+        outputs (dict): Output file path to the key of the inputs it was written from
+        verified (dict): Interview id to (key of the source and interview, verification problems)
+        stats (dict): Input file path to (size, modification time, content hash)
+        signatures (dict): Entry content key to MinHash signature bytes (None for entries too short to compare)
+    """
+    path = None
+    version = None
+    raw = None
+    parsed = None
+    outputs = None
+    verified = None
+    stats = None
+    signatures = None
+
+    def __init__(self, path):
+        """
+        Load the manifest from disk, or start an empty one if it is missing or stale.
+
+        Args:
+            path (str): Location of the manifest file
+        """
+        self.path = Path(path)
+        self.version = hash_file(__file__)
+        self.raw = {}
+        self.parsed = {}
+        self.outputs = {}
+        self.verified = {}
+        self.stats = {}
+        self.signatures = {}
+        if self.path.exists():
+            with open(self.path, 'rb') as f:
+                manifest = pickle.load(f)
+            if manifest.get("version") == self.version:
+                self.raw = manifest["raw"]
+                self.parsed = manifest["parsed"]
+                self.outputs = manifest["outputs"]
+                self.verified = manifest["verified"]
+                self.stats = manifest["stats"]
+                self.signatures = manifest["signatures"]
+                logger.info(f"Loaded build cache with {len(self.parsed)} interviews from {self.path}")
+            else:
+                logger.info(f"Ignoring build cache {self.path} written by a different version of this script")
+
+    def file_hash(self, file):
+        """
+        Get the content hash of an input file, reading it only if it changed.
+
+        The hash is remembered along with the file's size and modification
+        time, so files that were not touched since the last run are not read.
+
+        Args:
+            file (Path): File to hash
+
+        Returns:
+            str: Hex digest of the file contents
+        """
+        st = os.stat(file)
+        stat = self.stats.get(str(file))
+        if stat and stat[0] == st.st_size and stat[1] == st.st_mtime_ns:
+            return stat[2]
+        h = hash_file(file)
+        self.stats[str(file)] = (st.st_size, st.st_mtime_ns, h)
+        return h
+
+    def output_changed(self, path, key):
+        """
+        Check whether an output file needs to be rewritten.
+
+        Args:
+            path (str): Path of the output file
+            key (str): Key describing the inputs the output would be written from
+
+        Returns:
+            bool: True if the file is missing or was written from different inputs
+        """
+        return not os.path.exists(path) or self.outputs.get(str(path)) != key
+
+    def save(self):
+        """
+        Write the manifest to disk, replacing the previous one atomically.
+        """
+        os.makedirs(self.path.parent, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({"version": self.version, "raw": self.raw, "parsed": self.parsed, "outputs": self.outputs,
+                         "verified": self.verified, "stats": self.stats,
+                         "signatures": self.signatures}, f)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Wrote build cache with {len(self.parsed)} interviews to {self.path}")
+
+class Checkpoint:
+    """
+    Parse results saved periodically during a --keep-going run, so that a rerun
+    can resume where the last one left off.
+
+    Unlike the build cache, a checkpoint is reused even after this script
+    changes: the usual fix-rerun loop is to fix the parser for the pages that
+    failed and run again, and only the failed and unprocessed files need to be
+    parsed again then. The checkpoint is removed once a run parses every file.
+
+    Attributes:
+        path (Path): Location of the checkpoint file
+        version (str): Hash of the script that wrote the checkpoint
+        parsed (dict): Source file name to (content hash, Interview)
+        failures (dict): Source file name to ParseFailure from the last run
+    """
+    path = None
+    version = None
+    parsed = None
+    failures = None
+
+    def __init__(self, path):
+        """
+        Load the checkpoint from disk, or start an empty one if it is missing.
+
+        Args:
+            path (str): Location of the checkpoint file
+        """
+        self.path = Path(path)
+        self.version = hash_file(__file__)
+        self.parsed = {}
+        self.failures = {}
+        if self.path.exists():
+            with open(self.path, 'rb') as f:
+                checkpoint = pickle.load(f)
+            self.parsed = checkpoint["parsed"]
+            self.failures = checkpoint["failures"]
+            logger.info(f"Loaded checkpoint with {len(self.parsed)} interviews and {len(self.failures)} failures from {self.path}")
+            if checkpoint["version"] != self.version:
+                logger.info("Checkpoint was written by a different version of this script; only failed and unprocessed files will be parsed again")
+
+    def save(self):
+        """
+        Write the checkpoint to disk, replacing the previous one atomically.
+        """
+        os.makedirs(self.path.parent, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({"version": self.version, "parsed": self.parsed, "failures": self.failures}, f)
+        os.replace(tmp_path, self.path)
+        logger.debug("Wrote checkpoint with %s interviews to %s", len(self.parsed), self.path)
+
+    def remove(self):
+        """
+        Delete the checkpoint file once it is no longer needed.
+        """
+        if self.path.exists():
+            os.remove(self.path)
+            logger.info(f"Removed checkpoint {self.path}")
+
+class ParseFailure:
+    """
+    Record of a source file that could not be parsed.
+
+    Attributes:
+        file (str): Source file name
+        error (str): Exception type and message
+        check (str): Function, line number and source line of the check that failed
+    """
+    __slots__ = ('file', 'error', 'check')
+
+    def __init__(self, file, exception):
+        """
+        Describe a parse exception.
+
+        Args:
+            file (Path): Source file that failed
+            exception (Exception): The exception raised while parsing it
+        """
+        self.file = os.path.basename(file)
+        self.error = f"{type(exception).__name__}: {exception}"
+        frame = traceback.extract_tb(exception.__traceback__)[-1]
+        self.check = f"{frame.name}() line {frame.lineno}: {frame.line}"
+
+    def __str__(self):
+        return f"{self.file}: {self.error}\n    at {self.check}"
+
+class FailureCatcher:
+    """
+    Stage function wrapper that returns a ParseFailure instead of raising.
+
+    Instances can be pickled for the process pool as long as the wrapped
+    function is defined at module level.
+
+    Attributes:
+        func: Wrapped stage function taking (args, file)
+    """
+    func = None
+
+    def __init__(self, func):
+        self.func = func
+        self.__name__ = func.__name__
+
+    def __call__(self, args, file):
+        try:
+            return self.func(args, file)
+        except Exception as e:
+            logger.debug("Failed to parse %s: %s", file, e)
+            return ParseFailure(file, e)
+
+def hash_file(file):
+    """
+    Compute the SHA-256 hash of a file's contents.
+
     Args:
-        args: Command line arguments object containing configuration
-        file (Path): Path to the raw HTML file to normalize
-        
-    Note:
-        The function writes the normalized HTML to the normalize_dir
-        specified in the arguments, maintaining the same filename.
+        file (Path): File to hash
+
+    Returns:
+        str: Hex digest of the file contents
     """
-    logger.debug(f"Normalizing raw HTML file {file}")
-    # match = re.search(r'^(\d+)\.html{0,1}', os.path.basename(file))
-    # if not match:
-    #     raise RuntimeError(f"Filename does not match expected pattern: {file}")
-    with open(file, 'r', encoding='utf-8') as f:
-        html_content = f.read().replace('&#8232;', '')
-    soup = BeautifulSoup(html_content, 'html.parser')
-    with open(os.path.join(args.normalize_dir, os.path.basename(file)), 'w', encoding='utf-8') as f:
-        f.write(soup.prettify())
+    with open(file, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
 
-def process_html(args, file):
+def hash_key(*parts):
     """
-    Process a normalized HTML file and extract structured interview data.
-    
-    This is the core parsing function that extracts all interview information
-    from a normalized HTML file. It parses the specific HTML structure used
-    by the Theoryland Interview Database and creates Interview objects with
-    all metadata and entry content.
-    
-    The function expects a specific HTML structure:
-    - A main body column containing interview content
-    - An interview summary section with metadata fields
-    - An entry list section with individual Q&A entries
-    - Each entry contains an anchor, entry number, and entry data
-    
+    Combine arbitrary values into a single hex digest usable as a cache key.
+
     Args:
-        args: Command line arguments object containing configuration
-        file (Path): Path to the normalized HTML file to process
-        
+        *parts: Values to combine; each is converted with str()
+
     Returns:
-        Interview: A fully populated Interview object with all extracted data
-        
-    Raises:
-        RuntimeError: If the HTML structure doesn't match expectations
-        
-    Note:
-        The function performs extensive validation of the HTML structure
-        and will raise detailed error messages if the format is unexpected.
+        str: Hex digest of the combined values
     """
-    logger.debug(f"Processing HTML file {file}")
-    match = re.search(r'^(.+)\.html{0,1}$', os.path.basename(file))
-    if not match:
-        raise RuntimeError(f"Filename does not match expected pattern: {file}")
-    result = Interview()
-    interview_id = int(match.group(1))
-    result.id = interview_id
-    with open(os.path.join(args.normalize_dir, os.path.basename(file)), 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    soup = BeautifulSoup(html_content, 'html.parser')
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+class OutputFile(io.StringIO):
+    """
+    In-memory stand-in for a small output file opened with OutputFiles.open().
+
+    Text written to it is handed to OutputFiles.write() when the with block
+    exits normally, so the file on disk is only touched if the text changed.
+
+    Attributes:
+        name (str): Path of the output file
+    """
+
+    def __init__(self, owner, path, precompress=False):
+        super().__init__()
+        self.name = str(path)
+        self._owner = owner
+        self._precompress = precompress
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self._owner.write(self.name, self.getvalue(), self._precompress)
+        self.close()
+
+class OutputStream:
+    """
+    Large output file opened with OutputFiles.stream().
+
+    Text is streamed to a temporary file next to the output file. When the
+    with block exits normally, OutputFiles.finish() compares the two and
+    either moves the temporary file into place or deletes it, so the output
+    file is only touched if its contents changed.
+
+    Attributes:
+        name (str): Path of the output file
+    """
+    name = None
+
+    def __init__(self, owner, path, precompress=False):
+        self.name = str(path)
+        self._owner = owner
+        self._precompress = precompress
+        self._file = open(self.name + ".tmp", 'w', encoding='utf-8', newline='')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def write(self, text):
+        self._file.write(text)
+
+    def close(self):
+        """
+        Finish the file, replacing the output file if it changed.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._owner.finish(self.name, self._precompress)
+
+    def discard(self):
+        """
+        Delete the temporary file, leaving the output file untouched.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self.name + ".tmp")
+
+class OutputFiles:
+    """
+    Writes output files only when their contents change.
+
+    Before writing, the new contents are compared with the file on disk, and
+    an identical file is left alone so that its mtime does not change. This
+    works with or without the build cache, which only skips files whose inputs
+    are unchanged. Small files are built in memory with open(); large ones are
+    streamed through a temporary file with stream().
+
+    The large aggregate files can also get gzip (.gz) and, if the brotli
+    module is installed, brotli (.br) siblings for web servers that serve
+    precompressed files. The siblings are compressed again only when their
+    file changes.
+
+    Attributes:
+        precompress (bool): Whether to write compressed siblings for files that ask for them
+        written_files (int): Number of files written since the last reset
+        written_bytes (int): Number of bytes written since the last reset
+        skipped_files (int): Number of files left alone because they were unchanged
+        skipped_bytes (int): Size of the files left alone
+    """
+    precompress = False
+    written_files = 0
+    written_bytes = 0
+    skipped_files = 0
+    skipped_bytes = 0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def reset(self, precompress=False):
+        """
+        Clear the counters before a run.
+
+        Args:
+            precompress (bool, optional): Whether to write compressed siblings during the run
+        """
+        self.precompress = precompress
+        if precompress and brotli is None:
+            logger.warning("The brotli module is not installed; only .gz precompressed files will be written")
+        self.written_files = self.written_bytes = self.skipped_files = self.skipped_bytes = 0
+
+    def open(self, path, precompress=False):
+        """
+        Open a small output file for writing as text.
+
+        Args:
+            path (str): Path of the output file
+            precompress (bool, optional): Whether the file should get compressed siblings
+
+        Returns:
+            OutputFile: Buffer to use in a with block in place of the file
+        """
+        return OutputFile(self, path, precompress)
+
+    def stream(self, path, precompress=False):
+        """
+        Open a large output file for writing as text without buffering it in memory.
+
+        Args:
+            path (str): Path of the output file
+            precompress (bool, optional): Whether the file should get compressed siblings
+
+        Returns:
+            OutputStream: Stream to use in a with block in place of the file
+        """
+        return OutputStream(self, path, precompress)
+
+    def write(self, path, text, precompress=False):
+        """
+        Write an output file unless it already has exactly this content.
+
+        Args:
+            path (str): Path of the output file
+            text (str): Contents of the file
+            precompress (bool, optional): Whether the file should get compressed siblings
+
+        Returns:
+            bool: True if the file was written, False if it was unchanged
+        """
+        data = text.encode('utf-8')
+        changed = self._write_bytes(path, data)
+        if precompress:
+            self._write_siblings(path, changed, lambda: [data])
+        return changed
+
+    def finish(self, path, precompress=False):
+        """
+        Move the temporary file of an OutputStream into place if its contents changed.
+
+        Args:
+            path (str): Path of the output file
+            precompress (bool, optional): Whether the file should get compressed siblings
+
+        Returns:
+            bool: True if the file was replaced, False if it was unchanged
+        """
+        changed = self._replace(path + ".tmp", path)
+        if precompress:
+            self._write_siblings(path, changed, lambda: file_chunks(path))
+        return changed
+
+    def remove(self, path):
+        """
+        Remove an output file and any compressed siblings of it.
+
+        Args:
+            path (str): Path of the output file
+        """
+        for p in [path] + [f"{path}{suffix}" for suffix, _ in self.siblings()]:
+            if os.path.exists(p):
+                os.remove(p)
+
+    @staticmethod
+    def siblings():
+        """
+        Get the compressed siblings that can be written.
+
+        Returns:
+            list[tuple]: File name suffix and a function starting a compressor, for each
+                format. The compressor is returned as a function compressing the next chunk
+                of bytes and a function returning the remaining compressed bytes.
+        """
+        def gzip_compressor():
+            # A gzip stream with no file name and a zero timestamp, so unchanged files compress identically
+            c = zlib.compressobj(9, zlib.DEFLATED, 31)
+            return c.compress, c.flush
+
+        def brotli_compressor():
+            c = brotli.Compressor(quality=11)
+            return c.process, c.finish
+
+        formats = [(".gz", gzip_compressor)]
+        if brotli is not None:
+            formats.append((".br", brotli_compressor))
+        return formats
+
+    def _write_siblings(self, path, changed, chunks):
+        """
+        Bring the compressed siblings of an output file up to date.
+
+        Args:
+            path (str): Path of the output file
+            changed (bool): Whether the output file was just written
+            chunks (callable): Returns an iterable over the bytes of the output file
+        """
+        for suffix, compressor in self.siblings():
+            sibling = f"{path}{suffix}"
+            if not self.precompress:
+                # Never leave a compressed copy of old contents to be served
+                if os.path.exists(sibling):
+                    os.remove(sibling)
+            elif changed or not os.path.exists(sibling):
+                compress, flush = compressor()
+                with open(sibling + ".tmp", 'wb') as f:
+                    for chunk in chunks():
+                        f.write(compress(chunk))
+                    f.write(flush())
+                self._replace(sibling + ".tmp", sibling)
+
+    def _replace(self, tmp_path, path):
+        size = os.path.getsize(tmp_path)
+        try:
+            unchanged = os.path.getsize(path) == size and all(a == b for a, b in zip(file_chunks(tmp_path), file_chunks(path)))
+        except OSError:
+            unchanged = False
+        if unchanged:
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        self._count(unchanged, size)
+        return not unchanged
+
+    def _write_bytes(self, path, data):
+        try:
+            unchanged = os.path.getsize(path) == len(data)
+            if unchanged:
+                with open(path, 'rb') as f:
+                    unchanged = f.read() == data
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            with open(path, 'wb') as f:
+                f.write(data)
+        self._count(unchanged, len(data))
+        return not unchanged
+
+    def _count(self, unchanged, size):
+        with self._lock:
+            if unchanged:
+                self.skipped_files = self.skipped_files + 1
+                self.skipped_bytes = self.skipped_bytes + size
+            else:
+                self.written_files = self.written_files + 1
+                self.written_bytes = self.written_bytes + size
+
+    def report(self):
+        """
+        Log how much was written and how much was left unchanged.
+        """
+        logger.info(f"Wrote {self.written_files} output files ({self.written_bytes:,} bytes); "
+                    f"{self.skipped_files} files ({self.skipped_bytes:,} bytes) were unchanged")
+
+# Shared by every stage, including the Markdown page writer threads
+output_files = OutputFiles()
+
+def file_chunks(path, size=1 << 20):
+    """
+    Read a file in chunks.
+
+    Args:
+        path (str): Path of the file
+        size (int, optional): Chunk size in bytes
+
+    Yields:
+        bytes: The next chunk of the file
+    """
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+class RenderedInterview:
+    """
+    The Markdown for one interview, rendered once and shared by every output file.
+
+    The summary, links and entry bodies are formatted a single time and then
+    assembled into the section of the combined archive, the interview page
+    (t-{id}.md) and the page for each entry (t-{id}/{n}.md). Each file is
+    written with a single write call.
+
+    Attributes:
+        id (int): Interview id
+        combined (str): Section of the combined Markdown archive for this interview
+        page (str): Contents of the interview page
+        entry_pages (list[str]): Contents of each entry page, in entry order
+    """
+    id = None
+    combined = None
+    page = None
+    entry_pages = None
+
+    def __init__(self, interview, md_footer):
+        """
+        Render every Markdown output for an interview.
+
+        Args:
+            interview (Interview): Interview to render
+            md_footer (str): Footer appended to every standalone Markdown file
+        """
+        self.id = interview.id
+        url = f"https://www.theoryland.com/intvmain.php?i={interview.id}"
+        title = f"Interview #{interview.id}" + (f": {interview.title}" if interview.title else "")
+        summary = []
+        if interview.date:
+            summary.append(f"- Date: {datetime.strftime(interview.date, '%Y-%m-%d')}\n\n")
+        if interview.entryType:
+            summary.append(f"- Type: {interview.entryType}\n\n")
+        if interview.location:
+            summary.append(f"- Location: {interview.location}\n\n")
+        if interview.bookStore:
+            summary.append(f"- Bookstore: {interview.bookStore}\n\n")
+        if interview.tourCon:
+            summary.append(f"- Tour/Con: {interview.tourCon}\n\n")
+        if interview.reporter:
+            summary.append(f"- Reporter: {interview.reporter}\n\n")
+        summary = "".join(summary)
+        page_links = ""
+        combined_links = ""
+        if interview.links and len(interview.links) > 0:
+            links = ["[" + (link['text'] if link['text'] else link['href']) + f"]({link['href']})\n\n" for link in interview.links]
+            page_links = "### Links\n\n" + "".join(f"- {link}" for link in links) + "\n"
+            combined_links = "- Links:" + "".join(f" {link}" for link in links) + "\n\n"
+        body = []
+        self.entry_pages = []
+        for entry_i, entry in enumerate(interview.entries, start=1):
+            body.append(f"## [Entry #{entry_i}](./t-{interview.id}/{entry_i})\n\n{entry.content}\n\n")
+            self.entry_pages.append(f"# [{title}, Entry #{entry_i}]({url}#{entry_i})\n\n{entry.content}\n\n{md_footer}")
+        body = "".join(body) + "\n---\n\n"
+        self.combined = f"## [{title}]({url})\n\n### Summary\n\n{summary}{combined_links}{body}"
+        self.page = f"# [{title}]({url})\n\n## Summary\n\n{summary}{page_links}{body}{md_footer}"
+
+    def write_pages(self, output_dir):
+        """
+        Write the interview page and all of its entry pages.
+
+        Args:
+            output_dir (str): Directory to write the pages to
+        """
+        page_path = f"{output_dir}/t-{self.id}.md"
+        logger.debug("Writing interview Markdown to %s", page_path)
+        with output_files.open(page_path) as f:
+            f.write(self.page)
+        entry_dir = f"{output_dir}/t-{self.id}"
+        if self.entry_pages:
+            os.makedirs(entry_dir, exist_ok=True)
+        for entry_i, entry_page in enumerate(self.entry_pages, start=1):
+            with output_files.open(f"{entry_dir}/{entry_i}.md") as f:
+                f.write(entry_page)
+
+class CombinedArchive:
+    """
+    The combined Markdown archive, written as one file or split into shards.
+
+    Interviews are written in id order as they are rendered. Without sharding
+    everything goes to "{basename}.md". With sharding each interview goes to the
+    shard for its year, its id range or, with a size budget, to the current
+    shard until that shard is full. Every shard file is opened on first use and
+    all of them are streamed to in the same pass.
+
+    Attributes:
+        output_dir (str): Directory the archive is written to
+        basename (str): Base file name of the archive
+        shard_by (str): 'year', 'id', 'size' or None for a single file
+        shard_size (int): Interviews per shard for 'id', kilobytes per shard for 'size'
+        shards (dict): Shard label to shard description, in the order shards were opened
+    """
+    output_dir = None
+    basename = None
+    shard_by = None
+    shard_size = None
+    shards = None
+
+    def __init__(self, output_dir, basename, shard_by=None, shard_size=None):
+        """
+        Set up the archive; no file is opened until the first write.
+
+        Args:
+            output_dir (str): Directory to write the archive to
+            basename (str): Base file name of the archive
+            shard_by (str, optional): 'year', 'id' or 'size'; None or 'none' writes a single file
+            shard_size (int, optional): Interviews per shard for 'id', kilobytes per shard for 'size'
+        """
+        self.output_dir = output_dir
+        self.basename = basename
+        self.shard_by = shard_by if shard_by != 'none' else None
+        self.shard_size = shard_size
+        self.shards = {}
+        self._files = {}
+        self._part = 0  # Current part number with a size budget
+        self._part_bytes = 0  # Bytes written to the current part
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # Only reached with files still open if the archive was not finished
+        for f in self._files.values():
+            f.discard()
+        self._files = {}
+
+    def _shard(self, interview, size):
+        """
+        Get the label and title of the shard an interview belongs in.
+
+        Args:
+            interview (Interview): Interview about to be written
+            size (int): Size in bytes of the interview's section
+
+        Returns:
+            tuple[str, str]: Shard label (used in file names) and shard title
+        """
+        if self.shard_by == 'year':
+            if not interview.date:
+                return "undated", "Undated interviews"
+            return str(interview.date.year), f"Interviews from {interview.date.year}"
+        if self.shard_by == 'id':
+            first = (interview.id - 1) // self.shard_size * self.shard_size + 1
+            last = first + self.shard_size - 1
+            return f"{first}-{last}", f"Interviews #{first}-{last}"
+        if self._part == 0 or (self._part_bytes > 0 and self._part_bytes + size > self.shard_size * 1024):
+            self._part += 1
+            self._part_bytes = 0
+        self._part_bytes += size
+        return f"part-{self._part}", f"Part {self._part}"
+
+    def write(self, interview, text):
+        """
+        Append an interview's section to the file it belongs in.
+
+        Args:
+            interview (Interview): Interview being written
+            text (str): Its rendered section of the combined archive
+        """
+        if not self.shard_by:
+            label, title = None, None
+        else:
+            label, title = self._shard(interview, len(text.encode('utf-8')))
+        f = self._files.get(label)
+        if f is None:
+            path = f"{self.output_dir}/{self.basename}" + (f" {label}" if label else "") + ".md"
+            logger.debug("Writing combined Markdown to %s", path)
+            f = self._files[label] = output_files.stream(path, precompress=True)
+            if label:
+                self.shards[label] = {"label": label, "title": title,
+                                      "markdown": os.path.basename(path),
+                                      "index": f"index-{label}.md",
+                                      "interviews": []}
+                f.write(f"# [Theoryland Interview Database](./index): {title}\n\n")
+        if label:
+            self.shards[label]["interviews"].append(interview.id)
+        f.write(text)
+
+    def close(self, md_footer):
+        """
+        Finish every file with the footer and close it.
+
+        Args:
+            md_footer (str): Footer appended to every Markdown file
+
+        Returns:
+            list[dict]: Description of each shard, sorted by label order (empty without sharding)
+        """
+        for f in self._files.values():
+            f.write(md_footer)
+            f.close()
+        self._files = {}
+        return sorted(self.shards.values(), key=shard_order)
+
+def shard_order(shard):
+    """
+    Sort key putting shards in chronological, id or part order.
+
+    Args:
+        shard (dict): Shard description
+
+    Returns:
+        tuple: Sort key; undated shards sort last
+    """
+    numbers = re.findall(r'\d+', shard['label'])
+    return (not numbers, int(numbers[0]) if numbers else 0)
+
+def read_shard_list(path):
+    """
+    Read the shard list written by the previous sharded run.
+
+    Args:
+        path (str): Path of the shard list
+
+    Returns:
+        dict: The shard list, or None if there is none or it cannot be read
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+class JsonLinesWriter:
+    """
+    Writes interviews to JSON Lines archives one at a time as they are produced.
+
+    Each interview is written as a single line as soon as it is available, so
+    memory use does not grow with the size of the archive. Lines go to a
+    temporary file next to each archive, which replaces the archive only when
+    commit() is called, so a failed or interrupted run leaves the previous
+    archive in place. Paths ending in .gz are gzip compressed, with a fixed
+    timestamp so unchanged archives are byte-identical.
+
+    Attributes:
+        paths (list[str]): Output paths
+        files (list): Open text streams, one per output path
+    """
+    paths = None
+    files = None
+
+    def __init__(self, paths):
+        """
+        Open a temporary file for every output archive.
+
+        Args:
+            paths (list[str]): Output paths; may be empty, in which case writes do nothing
+        """
+        self.paths = [str(path) for path in paths]
+        self.files = []
+        for path in self.paths:
+            logger.info(f"Writing JSON Lines to {path}")
+            if path.endswith(".gz"):
+                self.files.append(io.TextIOWrapper(gzip.GzipFile(path + ".tmp", 'wb', mtime=0), encoding='utf-8'))
+            else:
+                self.files.append(open(path + ".tmp", 'w', encoding='utf-8'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close()
+        if exc_type is not None:
+            self.discard()
+
+    def write(self, interview):
+        """
+        Append one interview to every archive.
+
+        Args:
+            interview (Interview): Interview to write
+        """
+        if not self.files:
+            return
+        line = json.dumps(interview.toDict()) + "\n"
+        for f in self.files:
+            f.write(line)
+
+    def close(self):
+        for f in self.files:
+            f.close()
+        self.files = []
+
+    def commit(self):
+        """
+        Close the temporary files and move each one over its archive.
+        """
+        self.close()
+        for path in self.paths:
+            os.replace(path + ".tmp", path)
+
+    def discard(self):
+        """
+        Close and delete the temporary files, leaving the archives untouched.
+        """
+        self.close()
+        for path in self.paths:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+
+class Profiler:
+    """
+    Collects wall and CPU time per pipeline stage and per input file.
+
+    When disabled, stage() and record_file() do nothing, so the pipeline can
+    always be instrumented without paying for it.
+
+    Attributes:
+        enabled (bool): Whether timings are being collected
+        stages (dict): Stage name to {"wallSeconds", "cpuSeconds"}, in the order stages ran
+        files (dict): Per-file stage name (the stage function) to a list of
+            {"file", "wallSeconds", "cpuSeconds"} records
+    """
+    enabled = None
+    stages = None
+    files = None
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = {}
+        self.files = {}
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a pipeline stage. Repeated stages with the same name are summed.
+
+        Args:
+            name (str): Stage name
+        """
+        if not self.enabled:
+            yield
+            return
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            totals = self.stages.setdefault(name, {"wallSeconds": 0.0, "cpuSeconds": 0.0})
+            totals["wallSeconds"] += time.perf_counter() - wall
+            totals["cpuSeconds"] += time.process_time() - cpu
+
+    def record_file(self, stage, file, wall, cpu):
+        """
+        Record the time spent on one input file.
+
+        Args:
+            stage (str): Name of the per-file stage
+            file (Path): Input file
+            wall (float): Wall time in seconds
+            cpu (float): CPU time in seconds, as measured by the process that did the work
+        """
+        if self.enabled:
+            self.files.setdefault(stage, []).append({"file": str(file), "wallSeconds": wall, "cpuSeconds": cpu})
+
+    def slowest(self, stage, top):
+        """
+        Get the slowest files of a per-file stage.
+
+        Args:
+            stage (str): Name of the per-file stage
+            top (int): Number of files to return
+
+        Returns:
+            list[dict]: File records, slowest first
+        """
+        return sorted(self.files.get(stage, []), key=lambda r: r["wallSeconds"], reverse=True)[:top]
+
+    def report(self, top):
+        """
+        Log the stage timings and the slowest files of each per-file stage.
+
+        Args:
+            top (int): Number of slowest files to log per stage
+        """
+        logger.info("Stage timings (wall / CPU seconds):")
+        for name, totals in self.stages.items():
+            logger.info(f"  {name:<14} {totals['wallSeconds']:9.3f} {totals['cpuSeconds']:9.3f}")
+        for stage, records in self.files.items():
+            total = sum(r["wallSeconds"] for r in records)
+            logger.info(f"Slowest files for {stage} ({len(records)} files, {total:.3f}s total):")
+            for r in self.slowest(stage, top):
+                logger.info(f"  {r['file']}: {r['wallSeconds']:.3f}s wall, {r['cpuSeconds']:.3f}s CPU")
+
+    def write(self, path):
+        """
+        Write all collected timings as JSON.
+
+        Args:
+            path (str): Path of the metrics file
+        """
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            logger.info(f"Writing profile metrics to {f.name}")
+            json.dump({"stages": self.stages, "files": self.files}, f, indent=2)
+
+def timed_call(func, args, file):
+    """
+    Call a stage function on one file and measure how long it took.
+
+    This runs in the worker process when a process pool is used, so the CPU
+    time is that of the worker.
+
+    Args:
+        func: Stage function taking (args, file)
+        args: Command line arguments object containing configuration
+        file (Path): File to process
+
+    Returns:
+        tuple: (result of func, wall seconds, CPU seconds)
+    """
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    result = func(args, file)
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+def iter_stage(args, func, files, msg, profiler=None):
+    """
+    Run one processing stage over a list of files, printing progress as it goes.
+
+    When more than one job is requested, the files are fanned out over a process
+    pool. Results are always yielded in the same order as the input files, so the
+    output is identical regardless of the number of jobs. Each result is yielded as
+    soon as it is available so that callers can stream it to disk.
+
+    Args:
+        args: Command line arguments object containing configuration
+        func: Stage function taking (args, file), e.g. normalize_raw_html or process_html
+        files (list[Path]): Files to process
+        msg (str): Progress message to log before starting
+        profiler (Profiler, optional): Records the time spent on each file
+
+    Yields:
+        The return value of func for each file, in input order
+    """
+    logger.info(msg)
+    if not logger.isEnabledFor(logging.DEBUG):
+        print(msg, end='', flush=True)
+    count = 0
+    timed = profiler is not None and profiler.enabled
+    call = partial(timed_call, func, args) if timed else partial(func, args)
+    if args.jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=args.jobs)
+        chunksize = max(1, len(files) // (args.jobs * 4))
+        result_iter = executor.map(call, files, chunksize=chunksize)
+    else:
+        executor = None
+        result_iter = map(call, files)
+    try:
+        for file, result in zip(files, result_iter):
+            if timed:
+                result, wall, cpu = result
+                profiler.record_file(func.__name__, file, wall, cpu)
+            count += 1
+            if not logger.isEnabledFor(logging.DEBUG) and count % 5 == 0:
+                print(".", end='', flush=True)
+            yield result
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+    if not logger.isEnabledFor(logging.DEBUG):
+        print("")
+
+def main():
+    """
+    Main entry point for the HTML processing script.
+
+    Parses command line arguments and runs the conversion. When profiling is
+    requested, the collected timings are logged and saved once it finishes.
+    """
+    # Configured here rather than on import, so that importing this module has no side effects
+    logging.basicConfig(filename='tidbc.log', level=logging.INFO)
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+    parser = argparse.ArgumentParser(prog=__name__,
+                                     description="Process raw HTML files from Theoryland Interview Database and translate them into more locally useful forms.")
+    parser.add_argument('-r', '--raw-html-dir', type=str, help='Directory containing raw HTML files')
+    parser.add_argument('-o', '--output-dir', type=str, help='Directory to save processed output files', default="../../docs/theoryland/interviews")
+    parser.add_argument('-n', '--normalize', action='store_true', help='Normalize raw HTML files even if normalized files are present')
+    parser.add_argument('-z', '--normalize-dir', type=str, help='Directory containing normalized HTML files')
+    parser.add_argument('-d', '--direct', action='store_true', help='Parse raw HTML files directly instead of normalizing them to files first. If a normalize directory is given, the normalized main body column of each page is written there for debugging')
+    parser.add_argument('-p', '--html-parser', type=str, choices=['html.parser', 'lxml'], help='BeautifulSoup parser to use for raw HTML files in direct mode. lxml is faster but must be installed', default='html.parser')
+    parser.add_argument('-j', '--load-json', action='store_true', help='Load from existing JSON file instead of loading from normalized HTML files. Skips processing of raw and normalized HTML files')
+    parser.add_argument('-s', '--shard-by', type=str, choices=['none', 'year', 'id', 'size'], help='Split the combined Markdown archive and the index into shards by interview year, by id range or by size, with a top-level index.md linking a smaller index page per shard', default='none')
+    parser.add_argument('-e', '--shard-size', type=int, help='Interviews per shard with --shard-by id (default 100), or kilobytes per shard with --shard-by size (default 512)')
+    parser.add_argument('-g', '--tags', action='store_true', help='Write tags.json, mapping every entry tag to its entries, and, unless Markdown is skipped, a page per tag under tags/, linked from index.md')
+    parser.add_argument('-f', '--facets', action='store_true', help='Write facets.json, mapping every year, type, location, bookstore, tour/con and reporter to its interviews, and, unless Markdown is skipped, a page per value under facets/, linked from index.md')
+    parser.add_argument('-G', '--precompress', action='store_true', help='Also write gzip (.gz) and, if the brotli module is installed, brotli (.br) copies of the JSON archive, the combined Markdown and, when they are written, the tag and facet indexes, for web servers that serve precompressed files')
+    parser.add_argument('-k', '--skip-markdown', action='store_true', help='Skip generating Markdown files from the processed interviews')
+    parser.add_argument('-t', '--mw-template-path', type=str, help='Path to the Mediawiki template for converting from id to citation description', default="./processed/mediawiki-template-tidb-switch.template")
+    parser.add_argument('-M', '--mw-lua-dir', type=str, help='Directory to write the Scribunto Lua data module, the Lua module and the template that uses them to (e.g. ./processed/mediawiki-lua). They replace the switch template with a table lookup')
+    parser.add_argument('-l', '--log-level', type=int, help='Set the logging level')
+    parser.add_argument('-c', '--cache-path', type=str, help='Path to a build cache file. When given, unchanged HTML files are not re-normalized or re-parsed and unchanged output files are not rewritten')
+    parser.add_argument('-L', '--jsonl', action='store_true', help='Also write the archive as JSON Lines, one interview per line, streamed out as each interview is parsed')
+    parser.add_argument('-Z', '--jsonl-gzip', action='store_true', help='Also write a gzip-compressed copy of the JSON Lines archive')
+    parser.add_argument('-S', '--search-index-path', type=str, help='Path to write a SQLite full-text search index of all interview entries to, for use with search_interviews.py (e.g. ./processed/tidb-search.sqlite)')
+    parser.add_argument('-F', '--static-search', action='store_true', help='Write a static search index of all entries, split into small JSON files by term prefix, and a JavaScript client for it to the search directory of the output directory, so that the hosted copy can be searched in the browser')
+    parser.add_argument('-D', '--sqlite-path', type=str, help='Path to write a SQLite database of all interviews, entries, links and tags to, indexed on the summary fields for structured queries (e.g. ./processed/tidb.sqlite)')
+    parser.add_argument('-V', '--verify', action='store_true', help='Check every interview against its source HTML page, independently of the parser, and write a report of the differences. Exits non-zero if any interview differs')
+    parser.add_argument('-R', '--verify-report', type=str, help='Path to write the verification report to', default="./processed/tidb-verify-report.txt")
+    parser.add_argument('-X', '--near-duplicates', action='store_true', help='Find clusters of near-duplicate entries across interviews with MinHash and write them to near-duplicates.json and near-duplicates.md in the output directory')
+    parser.add_argument('-x', '--duplicate-threshold', type=float, help='Minimum estimated similarity (Jaccard index of word 5-grams) for two entries to count as near-duplicates', default=0.7)
+    parser.add_argument('-K', '--keep-going', action='store_true', help='Keep parsing when a file fails, and report every failure at the end. Parsed interviews are checkpointed so that a rerun only parses the failed and unprocessed files. No output files are written while any file fails')
+    parser.add_argument('-Q', '--checkpoint-path', type=str, help='Path of the --keep-going checkpoint file', default="./processed/tidb-checkpoint.pickle")
+    parser.add_argument('-E', '--checkpoint-every', type=int, help='Number of newly parsed files between --keep-going checkpoints', default=50)
+    parser.add_argument('-w', '--watch', action='store_true', help='After the first run, keep watching the raw and normalized HTML directories and rebuild whenever files change. Only changed interviews are processed again. Uses the build cache, ./processed/tidb-build-cache.pickle unless --cache-path is given')
+    parser.add_argument('-b', '--debounce', type=float, help='Seconds without further changes to wait for before rebuilding in --watch mode', default=2.0)
+    parser.add_argument('-i', '--poll-interval', type=float, help='Seconds between directory scans in --watch mode when inotify is not available', default=5.0)
+    parser.add_argument('-J', '--jobs', type=int, help='Number of worker processes to use for normalizing and parsing HTML files (0 for one per CPU)', default=1)
+    parser.add_argument('-W', '--write-jobs', type=int, help='Number of threads to use for writing per-interview Markdown files', default=1)
+    parser.add_argument('-P', '--profile', type=str, help='Record wall and CPU time per stage and per input file, log the slowest files, and write the metrics as JSON to this path')
+    parser.add_argument('-T', '--profile-top', type=int, help='Number of slowest files to log per stage when profiling', default=10)
+    parser.add_argument('-C', '--cprofile-path', type=str, help='Run the conversion under cProfile and dump the statistics to this path. Only the main process is profiled, so combine with --jobs 1 to include parsing')
+    args = parser.parse_args()
+    if args.jobs < 1:
+        args.jobs = os.cpu_count() or 1
+    if args.log_level:
+        logger.setLevel(args.log_level)
+        print(f"Log level set to {args.log_level}")
+    profiler = Profiler(enabled=bool(args.profile))
+    cprofile = cProfile.Profile() if args.cprofile_path else None
+    if cprofile:
+        cprofile.enable()
+    try:
+        if args.watch:
+            failed = watch(args, profiler)
+        else:
+            with profiler.stage("total"):
+                failed = convert(args, profiler)
+    finally:
+        if cprofile:
+            cprofile.disable()
+            cprofile.dump_stats(args.cprofile_path)
+            logger.info(f"Wrote cProfile statistics to {args.cprofile_path}")
+    if args.profile:
+        profiler.report(args.profile_top)
+        profiler.write(args.profile)
+    if failed:
+        sys.exit(1)
+
+class DirectoryWatcher:
+    """
+    Waits for files to change in a set of directories.
+
+    On Linux, inotify is used through the C library, so changes are seen as
+    soon as they happen. Elsewhere, or if inotify cannot be set up, the
+    directories are scanned every poll interval and compared with the previous
+    scan by file size and modification time.
+
+    Attributes:
+        dirs (list[str]): Watched directories
+        poll_interval (float): Seconds between scans when polling
+    """
+    dirs = None
+    poll_interval = None
+    # inotify event mask: file written and closed, moved in or out, created or deleted
+    IN_EVENTS = 0x00000008 | 0x00000040 | 0x00000080 | 0x00000100 | 0x00000200
+    IN_NONBLOCK = os.O_NONBLOCK
+
+    def __init__(self, dirs, poll_interval):
+        """
+        Start watching the directories.
+
+        Args:
+            dirs (list[str]): Directories to watch
+            poll_interval (float): Seconds between scans when polling
+        """
+        self.dirs = [str(d) for d in dirs]
+        self.poll_interval = poll_interval
+        self._fd = None
+        self._wds = {}
+        self._snapshot = None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(self.IN_NONBLOCK)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            for d in self.dirs:
+                wd = libc.inotify_add_watch(fd, os.fsencode(d), self.IN_EVENTS)
+                if wd < 0:
+                    os.close(fd)
+                    raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {d}")
+                self._wds[wd] = d
+            self._fd = fd
+            logger.info(f"Watching {', '.join(self.dirs)} with inotify")
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify is not available ({e}); polling {', '.join(self.dirs)} every {poll_interval} seconds")
+            self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for d in self.dirs:
+            with os.scandir(d) as it:
+                for entry in it:
+                    if entry.is_file():
+                        st = entry.stat()
+                        snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def _read(self, timeout):
+        """
+        Wait up to timeout seconds for changes.
+
+        Args:
+            timeout (float): Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            set[str]: Paths that changed; empty if the timeout passed first
+        """
+        if self._fd is None:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                time.sleep(self.poll_interval if deadline is None else max(0, min(self.poll_interval, deadline - time.monotonic())))
+                snapshot = self._scan()
+                changed = {p for p in snapshot.keys() | self._snapshot.keys() if snapshot.get(p) != self._snapshot.get(p)}
+                self._snapshot = snapshot
+                if changed or (deadline is not None and time.monotonic() >= deadline):
+                    return changed
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        data = os.read(self._fd, 65536)
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = struct.unpack_from('iIII', data, offset)
+            offset = offset + struct.calcsize('iIII')
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset = offset + length
+            if wd in self._wds:
+                changed.add(os.path.join(self._wds[wd], os.fsdecode(name)))
+        return changed
+
+    def wait(self, debounce):
+        """
+        Wait for a burst of changes to finish.
+
+        Blocks until something changes, then keeps collecting changes until
+        none have arrived for debounce seconds.
+
+        Args:
+            debounce (float): Seconds of quiet that end a burst
+
+        Returns:
+            set[str]: Paths that changed during the burst
+        """
+        changed = self._read(None)
+        while True:
+            more = self._read(debounce)
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+def watch(args, profiler):
+    """
+    Run the conversion, then rebuild whenever the HTML directories change.
+
+    The build cache is kept in memory between rebuilds. Unchanged input files
+    are recognized by size and modification time without being read, only
+    changed interviews are normalized and parsed again, and the aggregate
+    outputs are regenerated from the interviews already in memory. Runs until
+    interrupted.
+
+    Args:
+        args: Command line arguments object containing configuration
+        profiler (Profiler): Collects stage and per-file timings
+
+    Returns:
+        int: Result of the last rebuild, as returned by convert()
+    """
+    if not args.cache_path:
+        args.cache_path = "./processed/tidb-build-cache.pickle"
+    cache = BuildCache(args.cache_path)
+    if args.raw_html_dir and not args.direct:
+        # Changed raw files must be normalized again; the cache limits that to the changed ones
+        args.normalize = True
+    # With raw files, the normalized files are written by the rebuild itself and must not trigger another one
+    dirs = [d for d in ((args.raw_html_dir,) if args.raw_html_dir else (args.normalize_dir,)) if d]
+    watcher = DirectoryWatcher(dirs, args.poll_interval)
+    failed = 0
+    try:
+        while True:
+            try:
+                with profiler.stage("total"):
+                    failed = convert(args, profiler, cache)
+            except Exception:
+                logger.exception("Rebuild failed; waiting for further changes")
+            logger.info(f"Watching {', '.join(dirs)} for changes (Ctrl+C to stop)")
+            changed = watcher.wait(args.debounce)
+            logger.info(f"{len(changed)} files changed; rebuilding")
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
+    finally:
+        watcher.close()
+    return failed
+
+def convert(args, profiler, cache=None):
+    """
+    Run the conversion pipeline.
+
+    This function orchestrates the complete processing pipeline:
+    1. Optionally normalizes raw HTML files
+    2. Processes normalized (or raw) HTML files to extract structured data
+    3. Generates JSON output with all interview data
+    4. Optionally generates Markdown files for documentation
+    5. Optionally creates MediaWiki template for citations
+
+    The function handles the workflow logic, determining what steps to execute
+    based on command line flags and the presence of existing files.
+
+    Args:
+        args: Command line arguments object containing configuration
+        profiler (Profiler): Collects stage and per-file timings
+        cache (BuildCache, optional): Build cache to use instead of loading it from args.cache_path
+
+    Returns:
+        int: Number of files that failed to parse (with --keep-going) or interviews
+            that failed verification (with --verify); 0 if everything succeeded
+    """
+    basename = "theoryland interview database"
+    md_footer = "## Contributing\n\n*If you are viewing this on github.io, you can see that this site is open source. Please do not try to improve this page. It is auto-generated by a python script. If you have suggestions for improvements, please start a discussion on [the github repo](https://source.wot.wiki) or [the Discord](https://discord.wot.wiki).*"
+    if cache is None and args.cache_path:
+        cache = BuildCache(args.cache_path)
+    output_files.reset(args.precompress)
+    normalize = args.normalize
+    if args.load_json or args.direct:
+        normalize = False
+    elif not normalize:
+        p = Path(args.normalize_dir)
+        normalized_files = list(p.glob("*.html")) + list(p.glob("*.htm"))
+        normalize = len(normalized_files) == 0
+    if args.direct and args.normalize_dir:
+        os.makedirs(args.normalize_dir, exist_ok=True)
+    if normalize or (args.direct and not args.load_json):
+        html_dir = Path(args.raw_html_dir)
+        logger.info(f"Checking for raw HTML files in directory: {html_dir}")
+        if not html_dir.exists():
+            raise FileNotFoundError(f"Directory not found: {html_dir}")
+        logger.info(f"Globbing HTML files in {html_dir}")
+        html_files = list(html_dir.glob("*.html")) + list(html_dir.glob("*.htm"))
+        if not html_files:
+            logger.warning(f"No HTML files found in {html_dir}")
+            return 0
+    if normalize:
+        if cache:
+            raw_hashes = {f.name: cache.file_hash(f) for f in html_files}
+            html_files = [f for f in html_files if cache.raw.get(f.name) != raw_hashes[f.name] or not os.path.exists(os.path.join(args.normalize_dir, f.name))]
+            logger.info(f"{len(raw_hashes) - len(html_files)} raw HTML files unchanged since the last run")
+        with profiler.stage("normalize"):
+            for _ in iter_stage(args, normalize_raw_html, html_files, f"Processing {len(html_files)} raw HTML files", profiler):
+                pass
+        if cache:
+            cache.raw = raw_hashes
+        p = Path(args.normalize_dir)
+        normalized_files = list(p.glob("*.html")) + list(p.glob("*.htm"))
+    json_path = Path(f"{args.output_dir}/{basename}.json")
+    interviews = {}
+    corpus_key = None  # Cache key of the whole set of interviews
+    interview_keys = {}  # Cache key of each interview, by id
+    if not args.load_json:
+        if args.direct:
+            source_files, parse_func, source_kind = html_files, process_raw_html, "raw"
+        else:
+            source_files, parse_func, source_kind = normalized_files, process_html, "normalized"
+        parsed = {}  # Source file name to (content hash, Interview)
+        source_hashes = {}
+        checkpoint = Checkpoint(args.checkpoint_path) if args.keep_going else None
+        if cache or checkpoint:
+            source_hashes = {f.name: (cache.file_hash(f) if cache else hash_file(f)) for f in source_files}
+        if cache:
+            for f in source_files:
+                if f.name in cache.parsed and cache.parsed[f.name][0] == source_hashes[f.name]:
+                    parsed[f.name] = cache.parsed[f.name]
+            logger.info(f"{len(parsed)} {source_kind} HTML files unchanged since the last run")
+            # Any change to the set of source files changes the full archives
+            corpus_key = hash_key(*sorted(f"{name}:{h}" for name, h in source_hashes.items()))
+        if checkpoint:
+            resumed = 0
+            for f in source_files:
+                if f.name not in parsed and f.name in checkpoint.parsed and checkpoint.parsed[f.name][0] == source_hashes[f.name]:
+                    parsed[f.name] = checkpoint.parsed[f.name]
+                    resumed = resumed + 1
+            logger.info(f"Resumed {resumed} {source_kind} HTML files from the checkpoint")
+            checkpoint.parsed = dict(parsed)
+        parse_files = [f for f in source_files if f.name not in parsed]
+        jsonl_paths = archive_jsonl_paths(args, basename, cache, corpus_key)
+        failures = {}
+        results = iter_stage(args, FailureCatcher(parse_func) if checkpoint else parse_func, parse_files,
+                             f"Processing {len(parse_files)} {source_kind} HTML files", profiler)
+        with profiler.stage("parse"), JsonLinesWriter(jsonl_paths) as jsonl:
+            unsaved = 0  # Files parsed since the last checkpoint
+            for f in source_files:
+                if f.name not in parsed:
+                    result = next(results)
+                    if isinstance(result, ParseFailure):
+                        failures[f.name] = result
+                        continue
+                    parsed[f.name] = (source_hashes.get(f.name), result)
+                    if checkpoint:
+                        checkpoint.parsed[f.name] = parsed[f.name]
+                        unsaved = unsaved + 1
+                        if unsaved >= args.checkpoint_every:
+                            checkpoint.save()
+                            unsaved = 0
+                interview = parsed[f.name][1]
+                interviews[str(interview.id)] = interview
+                jsonl.write(interview)
+            # Let the stage finish its progress output
+            next(results, None)
+        if checkpoint:
+            checkpoint.failures = failures
+            if failures:
+                jsonl.discard()
+                checkpoint.save()
+                report_failures(failures, len(source_files))
+                if cache:
+                    # Successfully parsed files are still worth keeping; the archives are not recorded, so they are rewritten next time
+                    cache.parsed = parsed
+                    cache.save()
+                return len(failures)
+            checkpoint.remove()
+        jsonl.commit()
+        if cache:
+            cache.parsed = parsed
+            interview_keys = {str(v[1].id): v[0] for v in parsed.values()}
+            for path in jsonl_paths:
+                cache.outputs[path] = corpus_key
+        offsets_path = Path(f"{args.output_dir}/{basename}.offsets.json")
+        # Turning --precompress on or off adds or removes the compressed copies
+        archive_key = hash_key(corpus_key, args.precompress)
+        if not cache or cache.output_changed(json_path, archive_key) or cache.output_changed(offsets_path, archive_key):
+            with profiler.stage("json"):
+                write_json_archive(json_path, offsets_path, interviews)
+            if cache:
+                cache.outputs[str(json_path)] = archive_key
+                cache.outputs[str(offsets_path)] = archive_key
+    else:
+        with profiler.stage("load_json"):
+            interviews = load_json(json_path)
+        if cache:
+            interview_keys = {k: hash_key(v.toJSON()) for k, v in interviews.items()}
+            corpus_key = hash_file(json_path)
+        jsonl_paths = archive_jsonl_paths(args, basename, cache, corpus_key)
+        with profiler.stage("jsonl"), JsonLinesWriter(jsonl_paths) as jsonl:
+            for interview in interviews.values():
+                jsonl.write(interview)
+            jsonl.commit()
+        if cache:
+            for path in jsonl_paths:
+                cache.outputs[path] = corpus_key
+    failed = 0
+    if args.verify:
+        with profiler.stage("verify"):
+            failed = verify_interviews(args, interviews, cache, profiler)
+    if args.near_duplicates:
+        with profiler.stage("near_duplicates"):
+            clusters = find_near_duplicates(args, interviews, cache)
+            write_near_duplicates(args, interviews, clusters, md_footer)
+    if not args.skip_markdown:
+        combined_path = f"{args.output_dir}/{basename}.md"
+        shard_list_path = f"{args.output_dir}/shards.json"
+        previous_shards = read_shard_list(shard_list_path)
+        shards = []
+        shard_size = None
+        combined_key = hash_key(corpus_key, args.precompress)
+        if args.shard_by == 'none':
+            write_combined = not cache or cache.output_changed(combined_path, combined_key)
+        else:
+            shard_size = args.shard_size or (100 if args.shard_by == 'id' else 512)
+            shard_key = hash_key(combined_key, args.shard_by, shard_size)
+            write_combined = (not cache or cache.output_changed(shard_list_path, shard_key)
+                              or not previous_shards
+                              or not all(os.path.exists(f"{args.output_dir}/{shard['markdown']}") for shard in previous_shards['shards']))
+            if not write_combined:
+                shards = previous_shards['shards']
+        with profiler.stage("markdown"), \
+                CombinedArchive(args.output_dir, basename, args.shard_by, shard_size) if write_combined else nullcontext() as m, \
+                ThreadPoolExecutor(max_workers=args.write_jobs) if args.write_jobs > 1 else nullcontext() as pool:
+            msg = f"Writing Markdown to {combined_path if args.shard_by == 'none' else f'{args.output_dir}/{basename} *.md'} and {args.output_dir}/t-*.md"
+            logger.info(msg)
+            if not logger.isEnabledFor(logging.DEBUG):
+                print(msg, end='', flush=True)
+            pending = []  # Page writes still running on the pool
+            for i in range(1, len(interviews)+1):
+                if not logger.isEnabledFor(logging.DEBUG) and i % 5 == 0:
+                    print(".", end='', flush=True)
+                page_path = f"{args.output_dir}/t-{i}.md"
+                write_pages = not cache or cache.output_changed(page_path, interview_keys[str(i)])
+                if not (m or write_pages):
+                    continue
+                rendered = RenderedInterview(interviews[str(i)], md_footer)
+                if m:
+                    m.write(interviews[str(i)], rendered.combined)
+                if write_pages:
+                    if pool:
+                        pending.append(pool.submit(rendered.write_pages, args.output_dir))
+                        # Keep at most a few interviews' worth of Markdown waiting to be written
+                        if len(pending) > args.write_jobs * 4:
+                            pending.pop(0).result()
+                    else:
+                        rendered.write_pages(args.output_dir)
+                    if cache:
+                        cache.outputs[page_path] = interview_keys[str(i)]
+            for future in pending:
+                future.result()
+            if m:
+                shards = m.close(md_footer)
+            if not logger.isEnabledFor(logging.DEBUG):
+                print("")
+        if write_combined:
+            # Drop whatever the previous run wrote that this run did not
+            stale = []
+            if previous_shards:
+                written = {shard['markdown'] for shard in shards} | {shard['index'] for shard in shards}
+                stale += [f"{args.output_dir}/{name}" for shard in previous_shards['shards']
+                          for name in (shard['markdown'], shard['index']) if name not in written]
+            if shards:
+                stale.append(combined_path)
+                with output_files.open(shard_list_path) as f:
+                    logger.info(f"Writing shard list to {f.name}")
+                    json.dump({"shardBy": args.shard_by, "shardSize": shard_size, "shards": shards}, f, separators=(',', ':'))
+            elif previous_shards:
+                stale.append(shard_list_path)
+            for path in stale:
+                if os.path.exists(path):
+                    logger.info(f"Removing stale shard file {path}")
+                output_files.remove(path)
+                if cache:
+                    cache.outputs.pop(path, None)
+            if cache:
+                cache.outputs[shard_list_path if shards else combined_path] = shard_key if shards else combined_key
+        index_path = f"{args.output_dir}/index.md"
+        index_key = hash_key(args.tags, args.facets, args.static_search, *[f"{i.id}:{i.title}" for i in interviews.values()],
+                             *[f"{shard['label']}:{shard['interviews']}" for shard in shards])
+        if cache and not cache.output_changed(index_path, index_key):
+            logger.info(f"Interview index file {index_path} is up to date")
+        else:
+            with profiler.stage("index"):
+                write_index(args, interviews, index_path, basename, md_footer, shards)
+            if cache:
+                cache.outputs[index_path] = index_key
+    if args.tags:
+        with profiler.stage("tags"):
+            tag_index = build_tag_index(interviews)
+            write_tag_index(args, interviews, tag_index, cache, md_footer)
+    if args.facets:
+        with profiler.stage("facets"):
+            facet_index = build_facet_index(interviews)
+            write_facet_index(args, interviews, facet_index, cache, md_footer)
+    template_key = hash_key(*[f"{i.id}:{i.title}:{i.date}" for i in interviews.values()])
+    if args.mw_template_path:
+        if cache and not cache.output_changed(args.mw_template_path, template_key):
+            logger.info(f"Mediawiki template {args.mw_template_path} is up to date")
+        else:
+            with profiler.stage("template"):
+                write_mw_template(args, interviews)
+            if cache:
+                cache.outputs[args.mw_template_path] = template_key
+    if args.mw_lua_dir:
+        data_path = f"{args.mw_lua_dir}/Module_TIDB_data.lua"
+        if cache and not cache.output_changed(data_path, template_key):
+            logger.info(f"Mediawiki Lua data module {data_path} is up to date")
+        else:
+            with profiler.stage("lua"):
+                write_mw_lua(args, interviews, data_path)
+            if cache:
+                cache.outputs[data_path] = template_key
+    if args.search_index_path:
+        if cache and not cache.output_changed(args.search_index_path, corpus_key):
+            logger.info(f"Search index {args.search_index_path} is up to date")
+        else:
+            with profiler.stage("search_index"):
+                write_search_index(args, interviews)
+            if cache:
+                cache.outputs[args.search_index_path] = corpus_key
+    if args.static_search:
+        search_manifest = f"{args.output_dir}/search/index.json"
+        if cache and not cache.output_changed(search_manifest, corpus_key):
+            logger.info(f"Static search index {search_manifest} is up to date")
+        else:
+            with profiler.stage("static_search"):
+                write_static_search(args, interviews)
+            if cache:
+                cache.outputs[search_manifest] = corpus_key
+    if args.sqlite_path:
+        if cache and not cache.output_changed(args.sqlite_path, corpus_key):
+            logger.info(f"SQLite database {args.sqlite_path} is up to date")
+        else:
+            with profiler.stage("sqlite"):
+                write_sqlite_database(args, interviews)
+            if cache:
+                cache.outputs[args.sqlite_path] = corpus_key
+    output_files.report()
+    if cache:
+        cache.save()
+    return failed
+
+def report_failures(failures, total):
+    """
+    Log the files that failed to parse in a --keep-going run.
+
+    Args:
+        failures (dict): Source file name to ParseFailure
+        total (int): Number of source files
+    """
+    lines = [f"Failed to parse {len(failures)} of {total} files; no output files were written:"]
+    lines.extend(f"  {failures[name]}" for name in sorted(failures, key=lambda n: (len(n), n)))
+    logger.error("\n".join(lines))
+
+# Near-duplicate detection: word shingle length, signature size and LSH banding.
+# 20 bands of 6 rows make entries with a similarity of 0.7 candidates with
+# probability 0.92, and of 0.8 with probability 0.999.
+SHINGLE_WORDS = 5
+SIGNATURE_BINS = 120
+SIGNATURE_BANDS = 20
+# Entries with fewer words (e.g. "RAFO.") are too short for their similarity to mean anything
+DUPLICATE_MIN_WORDS = 12
+# Buckets larger than this are compared against their first member only, to stay near-linear
+DUPLICATE_MAX_BUCKET = 50
+
+def entry_signature(content):
+    """
+    Compute the MinHash signature of an entry's word shingles.
+
+    This uses one permutation hashing: every shingle is hashed once, the hash
+    picks one of SIGNATURE_BINS bins, and each bin keeps its smallest value.
+    Empty bins borrow the value of the next non-empty bin, mixed with the
+    distance to it. The fraction of equal bins of two signatures estimates the
+    Jaccard index of the two shingle sets, at a cost linear in the length of
+    the entry.
+
+    Args:
+        content (str): Entry Markdown
+
+    Returns:
+        bytes: The signature as SIGNATURE_BINS 32-bit values, or None if the entry is too short
+    """
+    words = re.findall(r'\w+', markdown_text(content).lower())
+    if len(words) < DUPLICATE_MIN_WORDS:
+        return None
+    bins = [None] * SIGNATURE_BINS
+    for i in range(len(words) - SHINGLE_WORDS + 1):
+        h = int.from_bytes(hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode('utf-8'), digest_size=8).digest(), 'big')
+        b = h % SIGNATURE_BINS
+        v = h // SIGNATURE_BINS
+        if bins[b] is None or v < bins[b]:
+            bins[b] = v
+    values = array('I')
+    for b in range(SIGNATURE_BINS):
+        distance = 0
+        while bins[(b + distance) % SIGNATURE_BINS] is None:
+            distance = distance + 1
+        values.append((bins[(b + distance) % SIGNATURE_BINS] ^ (distance * 0x9E3779B97F4A7C15)) & 0xFFFFFFFF)
+    return values.tobytes()
+
+def signature_similarity(a, b):
+    """
+    Estimate the similarity of two entries from their signatures.
+
+    Args:
+        a (array): Signature values of the first entry
+        b (array): Signature values of the second entry
+
+    Returns:
+        float: Fraction of equal signature values, between 0 and 1
+    """
+    return sum(1 for x, y in zip(a, b) if x == y) / SIGNATURE_BINS
+
+def find_near_duplicates(args, interviews, cache):
+    """
+    Find clusters of near-duplicate entries across all interviews.
+
+    Each entry gets a MinHash signature (reused from the build cache when the
+    entry did not change). The signatures are split into SIGNATURE_BANDS bands,
+    and entries sharing any band are candidates. Candidates whose estimated
+    similarity reaches args.duplicate_threshold are joined into clusters. The
+    work is linear in the number of entries, apart from the candidate pairs.
+
+    Args:
+        args: Command line arguments object containing configuration
+        interviews (dict): Interviews keyed by string id
+        cache (BuildCache): Build cache holding previous signatures, or None
+
+    Returns:
+        list[list[tuple]]: Clusters of (interview id, entry number, similarity to the first entry),
+            each sorted by interview and entry, largest clusters first
+    """
+    signatures = {}  # (interview id, entry number) to signature values
+    previous = cache.signatures if cache else {}
+    current = {}
+    computed = 0
+    for i in range(1, len(interviews)+1):
+        interview = interviews[str(i)]
+        for entry_i, entry in enumerate(interview.entries, start=1):
+            key = hash_key(entry.content)
+            if key not in current:
+                if key in previous:
+                    current[key] = previous[key]
+                else:
+                    current[key] = entry_signature(entry.content)
+                    computed = computed + 1
+            if current[key] is not None:
+                signatures[(interview.id, entry_i)] = array('I', current[key])
+    if cache:
+        cache.signatures = current
+    logger.info(f"Computed {computed} entry signatures, reused {len(current) - computed}")
+
+    rows = SIGNATURE_BINS // SIGNATURE_BANDS
+    buckets = {}
+    for entry_key, values in signatures.items():
+        for band in range(SIGNATURE_BANDS):
+            buckets.setdefault((band, tuple(values[band * rows:(band + 1) * rows])), []).append(entry_key)
+    parent = {}
+
+    def find(x):
+        while parent.get(x, x) != x:
+            parent[x] = parent.get(parent[x], parent[x])
+            x = parent[x]
+        return x
+
+    compared = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        if len(members) > DUPLICATE_MAX_BUCKET:
+            pairs = [(members[0], m) for m in members[1:]]
+        else:
+            pairs = [(a, b) for n, a in enumerate(members) for b in members[n + 1:]]
+        for a, b in pairs:
+            if (a, b) in compared or find(a) == find(b):
+                continue
+            compared.add((a, b))
+            if signature_similarity(signatures[a], signatures[b]) >= args.duplicate_threshold:
+                root = find(a)
+                parent.setdefault(root, root)
+                parent[find(b)] = root
+    logger.info(f"Compared {len(compared)} candidate pairs of {len(signatures)} entries")
+
+    groups = {}
+    for entry_key in parent:
+        groups.setdefault(find(entry_key), []).append(entry_key)
+    clusters = []
+    for members in groups.values():
+        members.sort()
+        first = signatures[members[0]]
+        clusters.append([(i, e, signature_similarity(first, signatures[(i, e)])) for i, e in members])
+    clusters.sort(key=lambda c: (-len(c), c[0][0], c[0][1]))
+    return clusters
+
+def write_near_duplicates(args, interviews, clusters, md_footer):
+    """
+    Write the near-duplicate report as JSON and, unless Markdown is skipped, as a Markdown page.
+
+    Args:
+        args: Command line arguments object containing configuration
+        interviews (dict): Interviews keyed by string id
+        clusters (list): Clusters returned by find_near_duplicates()
+        md_footer (str): Footer appended to every Markdown file
+    """
+    json_path = f"{args.output_dir}/near-duplicates.json"
+    with output_files.open(json_path) as f:
+        logger.info(f"Writing {len(clusters)} near-duplicate clusters to {f.name}")
+        json.dump({"threshold": args.duplicate_threshold,
+                   "clusters": [[{"interview": i, "entry": e, "similarity": round(sim, 3)} for i, e, sim in cluster] for cluster in clusters]},
+                  f, indent=2)
+    if args.skip_markdown:
+        return
+    with output_files.open(f"{args.output_dir}/near-duplicates.md") as f:
+        f.write("# Near-duplicate Entries\n\n")
+        f.write(f"{len(clusters)} groups of entries that appear to repeat the same text, with their estimated similarity to the first entry of the group. ")
+        f.write(f"Entries are grouped when at least {args.duplicate_threshold:.0%} of their five-word sequences match.\n\n")
+        for n, cluster in enumerate(clusters, start=1):
+            f.write(f"## Group {n}\n\n")
+            for i, e, sim in cluster:
+                title = interviews[str(i)].title
+                f.write(f"- [Interview #{i}" + (f": {title}" if title else "") + f", Entry #{e}](./t-{i}/{e}) ({sim:.0%})\n")
+            f.write("\n")
+        f.write(md_footer)
+
+# Length of the term prefix that picks the static search shard a term is in
+SEARCH_PREFIX_LENGTH = 2
+# Shorter terms are not indexed
+SEARCH_MIN_TERM_LENGTH = 2
+
+def search_terms(content):
+    """
+    Split an entry into the terms of the static search index.
+
+    Accents are stripped and the text is lower-cased, so terms are made of
+    ASCII letters and digits only. search.js splits queries the same way.
+
+    Args:
+        content (str): Entry Markdown
+
+    Returns:
+        list[str]: Terms in text order, with repeats
+    """
+    text = unicodedata.normalize('NFKD', markdown_text(content)).encode('ascii', 'ignore').decode('ascii').lower()
+    return [term for term in re.findall(r'[a-z0-9]+', text) if len(term) >= SEARCH_MIN_TERM_LENGTH]
+
+def write_static_search(args, interviews):
+    """
+    Write a static inverted index of entry text for searching in the browser.
+
+    The index is built in one pass over the entries and written to the search
+    directory of the output directory:
+
+    - index.json: Manifest with the shard list, the number of indexed entries and interview titles
+    - {prefix}.json: Every term starting with that prefix, mapped to its posting list
+    - search.js: Client that fetches only the shards for the query terms
+
+    A posting list is a flat array of [interview id delta, entry number,
+    term count] triples in interview and entry order. The id delta is the
+    difference from the previous triple's interview id (from 0 for the first).
+
+    Args:
+        args: Command line arguments object containing configuration
+        interviews (dict): Interviews keyed by string id
+    """
+    search_dir = f"{args.output_dir}/search"
+    os.makedirs(search_dir, exist_ok=True)
+    postings = {}  # Term to flat array of interview id, entry number, term count
+    entry_count = 0
+    for i in range(1, len(interviews)+1):
+        interview = interviews[str(i)]
+        for entry_i, entry in enumerate(interview.entries, start=1):
+            entry_count = entry_count + 1
+            counts = {}
+            for term in search_terms(entry.content):
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                p = postings.get(term)
+                if p is None:
+                    p = postings[term] = array('I')
+                p.extend((interview.id, entry_i, count))
+    shards = {}
+    for term in sorted(postings):
+        shards.setdefault(term[:SEARCH_PREFIX_LENGTH], []).append(term)
+    logger.info(f"Writing static search index of {len(postings)} terms in {len(shards)} shards to {search_dir}")
+    written = {"index.json", "search.js"}
+    for prefix, terms in shards.items():
+        encoded = {}
+        for term in terms:
+            p = postings[term]
+            flat = list(p)
+            for k in range(len(flat) - 3, 0, -3):
+                flat[k] = flat[k] - flat[k - 3]
+            encoded[term] = flat
+        output_files.write(f"{search_dir}/{prefix}.json", json.dumps(encoded, separators=(',', ':')))
+        written.add(f"{prefix}.json")
+    manifest = {
+        "version": 1,
+        "prefixLength": SEARCH_PREFIX_LENGTH,
+        "minTermLength": SEARCH_MIN_TERM_LENGTH,
+        "entries": entry_count,
+        "shards": list(shards),
+        "titles": {str(i): interviews[str(i)].title for i in range(1, len(interviews)+1) if interviews[str(i)].title},
+    }
+    output_files.write(f"{search_dir}/index.json", json.dumps(manifest, separators=(',', ':')))
+    output_files.write(f"{search_dir}/search.js", STATIC_SEARCH_CLIENT)
+    # Shards for prefixes that no longer occur
+    for name in os.listdir(search_dir):
+        if name.endswith(".json") and name not in written:
+            output_files.remove(f"{search_dir}/{name}")
+
+def write_search_index(args, interviews):
+    """
+    Write a SQLite FTS5 full-text search index of every interview entry.
+
+    Each row holds the Markdown content of one entry, which is the only indexed
+    column, along with the interview id, entry number and the interview's summary
+    metadata so that search results can be displayed without the archive. The
+    index is built in a temporary file and then moved into place, so readers
+    never see a partially written index.
+
+    Args:
+        args: Command line arguments object containing configuration
+        interviews (dict): Interviews keyed by string id
+    """
+    logger.info(f"Writing search index to {args.search_index_path}")
+    dirname = os.path.dirname(args.search_index_path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    tmp_path = args.search_index_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    db = sqlite3.connect(tmp_path)
+    try:
+        with db:
+            db.execute("""CREATE VIRTUAL TABLE entries USING fts5(content, interview UNINDEXED, entry UNINDEXED, title UNINDEXED,
+                date UNINDEXED, entryType UNINDEXED, location UNINDEXED, reporter UNINDEXED, tokenize='porter unicode61')""")
+            rows = []
+            for interview in interviews.values():
+                date = datetime.strftime(interview.date, '%Y-%m-%d') if interview.date else None
+                for entry_i, entry in enumerate(interview.entries, start=1):
+                    rows.append((entry.content, interview.id, entry_i, interview.title, date, interview.entryType, interview.location, interview.reporter))
+            db.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            db.execute("INSERT INTO entries(entries) VALUES ('optimize')")
+    finally:
+        db.close()
+    os.replace(tmp_path, args.search_index_path)
+    logger.info(f"  Indexed {len(rows)} entries")
+
+def write_sqlite_database(args, interviews):
+    """
+    Write the interviews to a SQLite database for structured queries.
+
+    The database has one table each for interviews, entries, links and entry
+    tags, keyed by interview id (and entry number). The interview summary
+    fields, the date and its year are indexed, so queries such as "all signings
+    in 2005 reported by X" are index lookups. Dates are ISO 8601 strings.
+    Every table is filled in a single transaction in a temporary file, which
+    is then moved into place.
+
+    Args:
+        args: Command line arguments object containing configuration
+        interviews (dict): Interviews keyed by string id
+    """
+    logger.info(f"Writing SQLite database to {args.sqlite_path}")
+    dirname = os.path.dirname(args.sqlite_path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    tmp_path = args.sqlite_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    db = sqlite3.connect(tmp_path)
+    try:
+        with db:
+            db.executescript("""
+                CREATE TABLE interviews (id INTEGER PRIMARY KEY, title TEXT, entryCount INTEGER, date TEXT, year INTEGER,
+                    entryType TEXT, location TEXT, bookStore TEXT, tourCon TEXT, reporter TEXT);
+                CREATE TABLE entries (interview INTEGER NOT NULL REFERENCES interviews(id), entry INTEGER NOT NULL,
+                    content TEXT, PRIMARY KEY (interview, entry)) WITHOUT ROWID;
+                CREATE TABLE links (interview INTEGER NOT NULL REFERENCES interviews(id), position INTEGER NOT NULL,
+                    href TEXT, text TEXT, PRIMARY KEY (interview, position)) WITHOUT ROWID;
+                CREATE TABLE tags (interview INTEGER NOT NULL, entry INTEGER NOT NULL, tag TEXT NOT NULL,
+                    PRIMARY KEY (interview, entry, tag), FOREIGN KEY (interview, entry) REFERENCES entries(interview, entry)) WITHOUT ROWID;
+            """)
+            interview_rows, entry_rows, link_rows, tag_rows = [], [], [], []
+            for interview in interviews.values():
+                date = datetime.strftime(interview.date, '%Y-%m-%d') if interview.date else None
+                interview_rows.append((interview.id, interview.title, interview.entryCount, date, interview.date.year if interview.date else None,
+                                       interview.entryType, interview.location, interview.bookStore, interview.tourCon, interview.reporter))
+                for entry_i, entry in enumerate(interview.entries, start=1):
+                    entry_rows.append((interview.id, entry_i, entry.content))
+                    tag_rows.extend((interview.id, entry_i, tag) for tag in dict.fromkeys(entry.tags))
+                for link_i, link in enumerate(interview.links or [], start=1):
+                    link_rows.append((interview.id, link_i, link['href'], link['text']))
+            db.executemany("INSERT INTO interviews VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", interview_rows)
+            db.executemany("INSERT INTO entries VALUES (?, ?, ?)", entry_rows)
+            db.executemany("INSERT INTO links VALUES (?, ?, ?, ?)", link_rows)
+            db.executemany("INSERT INTO tags VALUES (?, ?, ?)", tag_rows)
+            # Indexes are built after the bulk insert, which is faster than updating them row by row
+            db.executescript("""
+                CREATE INDEX interviews_date ON interviews(date);
+                CREATE INDEX interviews_year ON interviews(year, entryType);
+                CREATE INDEX interviews_entryType ON interviews(entryType, date);
+                CREATE INDEX interviews_location ON interviews(location);
+                CREATE INDEX interviews_bookStore ON interviews(bookStore);
+                CREATE INDEX interviews_tourCon ON interviews(tourCon);
+                CREATE INDEX interviews_reporter ON interviews(reporter, date);
+                CREATE INDEX tags_tag ON tags(tag);
+                ANALYZE;
+            """)
+    finally:
+        db.close()
+    os.replace(tmp_path, args.sqlite_path)
+    logger.info(f"  Wrote {len(interview_rows)} interviews, {len(entry_rows)} entries, {len(link_rows)} links and {len(tag_rows)} tags")
+
+def archive_jsonl_paths(args, basename, cache, corpus_key):
+    """
+    Determine which JSON Lines archives need to be written during this run.
+
+    Args:
+        args: Command line arguments object containing configuration
+        basename (str): Base file name of the full archives
+        cache (BuildCache): Build cache, or None if caching is disabled
+        corpus_key (str): Cache key of the whole set of interviews
+
+    Returns:
+        list[str]: Paths of the JSON Lines archives to write
+    """
+    paths = []
+    if args.jsonl:
+        paths.append(f"{args.output_dir}/{basename}.jsonl")
+    if args.jsonl_gzip:
+        paths.append(f"{args.output_dir}/{basename}.jsonl.gz")
+    if cache:
+        paths = [path for path in paths if cache.output_changed(path, corpus_key)]
+    return paths
+
+def indent_json(text, indent):
+    """
+    Indent every line but the first of a json.dumps() result.
+
+    Strings in JSON output never contain raw newlines, so this nests a
+    separately dumped value exactly as json.dump(indent=2) would.
+
+    Args:
+        text (str): JSON text
+        indent (int): Number of spaces to add
+
+    Returns:
+        str: The indented text
+    """
+    return text.replace("\n", "\n" + " " * indent)
+
+def write_json_archive(json_path, offsets_path, interviews):
+    """
+    Write the JSON archive and the offset index used by interview_reader.py.
+
+    The archive is streamed out one interview at a time, assembled one entry
+    at a time so that the position of each can be recorded. The text is identical to what
+    json.dump(indent=2) would produce. It is pure ASCII, so character counts
+    are byte offsets.
+
+    The offset index maps each interview id to [start, end, entries], where
+    start and end delimit the interview's JSON object in the archive and
+    entries holds a [start, end] pair for each entry's object. The archive
+    size is stored with it, so readers can detect an index that does not
+    match the archive.
+
+    Args:
+        json_path (Path): Path of the JSON archive
+        offsets_path (Path): Path of the offset index
+        interviews (dict): Interviews keyed by string id
+    """
+    offsets = {}
+    logger.info(f"Writing JSON to {json_path}")
+    with output_files.stream(json_path, precompress=True) as f:
+        f.write("{")
+        pos = 1
+        for k, interview in interviews.items():
+            d = interview.toDict()
+            entries = d.pop('entries')
+            prefix = ("\n  " if pos == 1 else ",\n  ") + json.dumps(k) + ": "
+            pos = pos + len(prefix)
+            # toDict() puts the entries last, so they can be appended to the dumped summary fields
+            head = indent_json(json.dumps(d, indent=2), 2)[:-len("\n  }")]
+            entry_offsets = []
+            if entries is None:
+                body = head + ',\n    "entries": null'
+            elif not entries:
+                body = head + ',\n    "entries": []'
+            else:
+                body = [head, ',\n    "entries": [']
+                entry_pos = pos + len(head) + len(body[1])
+                for entry_i, entry in enumerate(entries):
+                    separator = "\n      " if entry_i == 0 else ",\n      "
+                    text = indent_json(json.dumps(entry, indent=2), 6)
+                    entry_pos = entry_pos + len(separator)
+                    entry_offsets.append([entry_pos, entry_pos + len(text)])
+                    entry_pos = entry_pos + len(text)
+                    body.append(separator)
+                    body.append(text)
+                body.append("\n    ]")
+                body = "".join(body)
+            body = body + "\n  }"
+            offsets[k] = [pos, pos + len(body), entry_offsets]
+            f.write(prefix)
+            f.write(body)
+            pos = pos + len(body)
+        end = "\n}" if pos > 1 else "}"
+        f.write(end)
+        pos = pos + len(end)
+    logger.info(f"Writing JSON offset index to {offsets_path}")
+    with output_files.open(offsets_path) as f:
+        json.dump({"archiveSize": pos, "interviews": offsets}, f, separators=(',', ':'))
+
+def load_json(json_path):
+    """
+    Load previously processed interviews from the JSON archive.
+
+    Args:
+        json_path (Path): Path of the JSON archive written by a previous run
+
+    Returns:
+        dict: Interviews keyed by string id, in archive order
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        logger.info(f"Reading JSON from {f.name}")
+        data = json.load(f)
+    return {k: Interview.fromJSON(v) for k, v in data.items()}
+
+def write_index(args, interviews, index_path, basename, md_footer, shards=None):
+    """
+    Write the Markdown index file listing every interview.
+
+    When the combined archive is sharded, the index lists the shards instead
+    and an index page is written next to it for each shard, listing that
+    shard's interviews.
+
+    Args:
+        args: Command line arguments object containing configuration
+        interviews (dict): Interviews keyed by string id
+        index_path (str): Path of the index file to write
+        basename (str): Base file name of the full archives, for the download links
+        md_footer (str): Footer appended to every Markdown file
+        shards (list[dict], optional): Shards of the combined archive, as returned by CombinedArchive.close
+    """
+    def interview_line(i):
+        return f"- [Interview #{i}" + (f": {interviews[str(i)].title}" if interviews[str(i)].title else "") + f"](./t-{i})" + "\n"
+
+    with output_files.open(index_path) as f:
+        logger.info(f"Writing interview index file to {f.name}")
+        f.write("# [Theoryland Interview Database](https://www.theoryland.com/listintv.php)\n\n")
+        f.write("This copy of the [Theoryland Interview Database](https://www.theoryland.com/listintv.php) is better suited for simple text searches and machine processing than the original. The original is more convenient for simple searches and has a bit of a prettier look.\n\n")
+        f.write("All copyrights and licenses for the interviews belong to Theoryland or their original authors. We are not affiliated with Theoryland in any way.\n\n")
+        f.write("## Downloads\n\n")
+        f.write(f"* Full archive [JSON](./{basename}.json)\n\n")
+        if shards:
+            f.write("* Full archive Markdown, in parts: " + ", ".join(f"[{shard['label']}](./{shard['markdown']})" for shard in shards) + "\n\n")
+            f.write("* Shard list [JSON](./shards.json)\n\n")
+        else:
+            f.write(f"* Full archive [Markdown](./{basename}.md)\n\n")
+        if args.tags:
+            f.write("* Tag index [JSON](./tags.json)\n\n")
+        if args.facets:
+            f.write("* Facet index [JSON](./facets.json)\n\n")
+        if args.static_search:
+            f.write("* Search index [JSON](./search/index.json) and [client](./search/search.js)\n\n")
+        if args.tags:
+            f.write("## Tags\n\n")
+            f.write("Browse entries [by tag](./tags/index).\n\n")
+        if args.facets:
+            f.write("## Facets\n\n")
+            f.write("Browse interviews [by year, type, location, bookstore, tour/con and reporter](./facets/index).\n\n")
+        f.write("## Interviews\n\n")
+        if not shards:
+            for i in range(1, len(interviews)+1):
+                f.write(interview_line(i))
+        for shard in shards or []:
+            count = len(shard['interviews'])
+            f.write(f"- [{shard['title']}](./{shard['index'][:-len('.md')]}) ({count} interview{'s' if count != 1 else ''})\n")
+        f.write(md_footer)
+    for shard in shards or []:
+        with output_files.open(f"{os.path.dirname(index_path)}/{shard['index']}") as f:
+            logger.debug("Writing shard index file to %s", f.name)
+            f.write(f"# [Theoryland Interview Database](./index): {shard['title']}\n\n")
+            f.write(f"Full text of these interviews: [Markdown](./{shard['markdown']})\n\n")
+            f.write("## Interviews\n\n")
+            for i in shard['interviews']:
+                f.write(interview_line(i))
+            f.write(md_footer)
+
+def tag_slug(tag, default="tag"):
+    """
+    Convert a tag to the base name of its Markdown page.
+
+    Args:
+        tag (str): Tag text
+        default (str, optional): Name to use when the tag has no letters or digits
+
+    Returns:
+        str: Lower case name made of letters, digits and dashes
+    """
+    return re.sub(r'[^a-z0-9]+', '-', tag.lower()).strip('-') or default
+
+def page_name(text, pages, default="tag"):
+    """
+    Pick a page name for a tag or facet value that no other page in the same directory uses.
+
+    Args:
+        text (str): Tag or facet value
+        pages (set): Page names already taken; the chosen name is added to it
+        default (str, optional): Name to use when the text has no letters or digits
+
+    Returns:
+        str: Page name, suffixed with a number if the plain name was taken
+    """
+    # Values differing only in case or punctuation would share a page name
+    page = slug = tag_slug(text, default)
+    n = 2
+    while page in pages:
+        page = f"{slug}-{n}"
+        n = n + 1
+    pages.add(page)
+    return page
+
+def build_tag_index(interviews):
+    """
+    Build the inverted index from each entry tag to the entries carrying it.
+
+    Args:
+        interviews (dict): Interviews keyed by string id
+
+    Returns:
+        dict: Tag to {"page": page name, "entries": [[interview id, entry number], ...]},
+            sorted by tag, with entries in interview and entry order
+    """
+    entries = {}
+    for i in range(1, len(interviews)+1):
+        interview = interviews[str(i)]
+        for entry_i, entry in enumerate(interview.entries, start=1):
+            for tag in entry.tags:
+                entries.setdefault(tag, []).append([interview.id, entry_i])
+    tag_index = {}
+    pages = set()
+    for tag in sorted(entries, key=lambda t: (t.lower(), t)):
+        tag_index[tag] = {"page": page_name(tag, pages), "entries": entries[tag]}
+    return tag_index
+
+def write_tag_index(args, interviews, tag_index, cache, md_footer):
+    """
+    Write the tag lookup file and, unless Markdown is skipped, the tag pages.
+
+    tags.json maps every tag to its page and its entries. tags/index.md lists
+    every tag and tags/{page}.md lists the entries with that tag, grouped by
+    interview.
+
+    Args:
+        args: Command line arguments object containing configuration
+        interviews (dict): Interviews keyed by string id
+        tag_index (dict): Index returned by build_tag_index()
+        cache (BuildCache): Build cache used to skip unchanged files, or None
+        md_footer (str): Footer appended to every Markdown file
+    """
+    json_path = f"{args.output_dir}/tags.json"
+    json_text = json.dumps(tag_index, separators=(',', ':'))
+    json_key = hash_key(json_text, args.precompress)
+    if not cache or cache.output_changed(json_path, json_key):
+        with output_files.open(json_path, precompress=True) as f:
+            logger.info(f"Writing tag index to {f.name}")
+            f.write(json_text)
+        if cache:
+            cache.outputs[json_path] = json_key
+    if args.skip_markdown:
+        return
+    tags_dir = f"{args.output_dir}/tags"
+    os.makedirs(tags_dir, exist_ok=True)
+    index_path = f"{tags_dir}/index.md"
+    index_key = hash_key(*[f"{tag}:{t['page']}:{len(t['entries'])}" for tag, t in tag_index.items()])
+    if not cache or cache.output_changed(index_path, index_key):
+        with output_files.open(index_path) as f:
+            logger.info(f"Writing tag list to {f.name}")
+            f.write("# Theoryland Interview Database Tags\n\n")
+            f.write("".join(f"- [{tag}](./{t['page']}) ({len(t['entries'])})\n" for tag, t in tag_index.items()))
+            f.write(f"\n{md_footer}")
+        if cache:
+            cache.outputs[index_path] = index_key
+    written = 0
+    for tag, t in tag_index.items():
+        page_path = f"{tags_dir}/{t['page']}.md"
+        lines = []
+        previous = None
+        for interview_id, entry_i in t['entries']:
+            if interview_id != previous:
+                title = interviews[str(interview_id)].title
+                lines.append(("\n" if previous else "") + f"## [Interview #{interview_id}" + (f": {title}" if title else "") + f"](../t-{interview_id})\n\n")
+                previous = interview_id
+            lines.append(f"- [Entry #{entry_i}](../t-{interview_id}/{entry_i})\n")
+        page = f"# Tag: {tag}\n\n{len(t['entries'])} entries\n\n" + "".join(lines) + f"\n{md_footer}"
+        page_key = hash_key(page)
+        if cache and not cache.output_changed(page_path, page_key):
+            continue
+        with output_files.open(page_path) as f:
+            f.write(page)
+        written = written + 1
+        if cache:
+            cache.outputs[page_path] = page_key
+    logger.info(f"Wrote {written} of {len(tag_index)} tag pages to {tags_dir}")
+    # Pages of tags that are gone, or whose page name changed
+    pages = {"index.md"} | {f"{t['page']}.md" for t in tag_index.values()}
+    for name in os.listdir(tags_dir):
+        if name.endswith(".md") and name not in pages:
+            logger.info(f"Removing stale tag page {tags_dir}/{name}")
+            output_files.remove(f"{tags_dir}/{name}")
+
+# Facet name, Interview attribute and heading for each faceted summary field
+FACET_FIELDS = (
+    ('year', 'date', "Year"),
+    ('type', 'entryType', "Type"),
+    ('location', 'location', "Location"),
+    ('bookstore', 'bookStore', "Bookstore"),
+    ('tourcon', 'tourCon', "Tour/Con"),
+    ('reporter', 'reporter', "Reporter"),
+)
+
+def facet_key(value):
+    """
+    Normalize a summary field value so that spelling variants share a facet.
+
+    Args:
+        value: Field value; datetimes are reduced to their year
+
+    Returns:
+        str: Case-folded value with whitespace collapsed, or None if the value is empty
+    """
+    if isinstance(value, datetime):
+        return str(value.year)
+    if value is None:
+        return None
+    return collapse_whitespace(str(value)).casefold() or None
+
+def build_facet_index(interviews):
+    """
+    Build an index from each value of each summary field to the interviews having it.
+
+    All facets are built in a single pass over the interviews. Values that
+    differ only in case or whitespace share a key; each key is labelled with
+    its most common spelling.
+
+    Args:
+        interviews (dict): Interviews keyed by string id
+
+    Returns:
+        dict: Facet name to {key: {"label": str, "page": page name, "count": int,
+            "interviews": [interview id, ...]}}, with keys sorted and interviews in id order
+    """
+    groups = {facet: {} for facet, _, _ in FACET_FIELDS}
+    spellings = {facet: {} for facet, _, _ in FACET_FIELDS}
+    for i in range(1, len(interviews)+1):
+        interview = interviews[str(i)]
+        for facet, attr, _ in FACET_FIELDS:
+            value = getattr(interview, attr)
+            key = facet_key(value)
+            if key is None:
+                continue
+            groups[facet].setdefault(key, []).append(interview.id)
+            label = key if isinstance(value, datetime) else collapse_whitespace(value)
+            counts = spellings[facet].setdefault(key, {})
+            counts[label] = counts.get(label, 0) + 1
+    facet_index = {}
+    for facet, _, _ in FACET_FIELDS:
+        pages = set()
+        facet_index[facet] = {}
+        for key in sorted(groups[facet]):
+            # Ties go to the spelling seen first
+            label = max(spellings[facet][key].items(), key=lambda item: item[1])[0]
+            facet_index[facet][key] = {"label": label, "page": page_name(key, pages, "value"),
+                                       "count": len(groups[facet][key]), "interviews": groups[facet][key]}
+    return facet_index
+
+def write_facet_index(args, interviews, facet_index, cache, md_footer):
+    """
+    Write the facet lookup file and, unless Markdown is skipped, the facet pages.
+
+    facets.json maps every facet to its keys, and each key to its label, page,
+    count and interviews. facets/index.md lists every value of every facet and
+    facets/{facet}/{page}.md lists the interviews with that value.
+
+    Args:
+        args: Command line arguments object containing configuration
+        interviews (dict): Interviews keyed by string id
+        facet_index (dict): Index returned by build_facet_index()
+        cache (BuildCache): Build cache used to skip unchanged files, or None
+        md_footer (str): Footer appended to every Markdown file
+    """
+    json_path = f"{args.output_dir}/facets.json"
+    json_text = json.dumps(facet_index, separators=(',', ':'))
+    json_key = hash_key(json_text, args.precompress)
+    if not cache or cache.output_changed(json_path, json_key):
+        with output_files.open(json_path, precompress=True) as f:
+            logger.info(f"Writing facet index to {f.name}")
+            f.write(json_text)
+        if cache:
+            cache.outputs[json_path] = json_key
+    if args.skip_markdown:
+        return
+    facets_dir = f"{args.output_dir}/facets"
+    os.makedirs(facets_dir, exist_ok=True)
+    index_path = f"{facets_dir}/index.md"
+    index_key = hash_key(*[f"{facet}:{v['label']}:{v['page']}:{v['count']}" for facet, values in facet_index.items() for v in values.values()])
+    if not cache or cache.output_changed(index_path, index_key):
+        with output_files.open(index_path) as f:
+            logger.info(f"Writing facet list to {f.name}")
+            f.write("# Theoryland Interview Database Facets\n\n")
+            for facet, _, heading in FACET_FIELDS:
+                f.write(f"## {heading}\n\n")
+                f.write("".join(f"- [{v['label']}](./{facet}/{v['page']}) ({v['count']})\n" for v in facet_index[facet].values()))
+                f.write("\n")
+            f.write(md_footer)
+        if cache:
+            cache.outputs[index_path] = index_key
+    written = 0
+    total = 0
+    for facet, _, heading in FACET_FIELDS:
+        os.makedirs(f"{facets_dir}/{facet}", exist_ok=True)
+        for v in facet_index[facet].values():
+            total = total + 1
+            page_path = f"{facets_dir}/{facet}/{v['page']}.md"
+            lines = []
+            for interview_id in v['interviews']:
+                interview = interviews[str(interview_id)]
+                lines.append(f"- [Interview #{interview_id}" + (f": {interview.title}" if interview.title else "") + f"](../../t-{interview_id})"
+                             + (f" ({datetime.strftime(interview.date, '%Y-%m-%d')})" if interview.date else "") + "\n")
+            page = f"# {heading}: {v['label']}\n\n{v['count']} interview{'s' if v['count'] != 1 else ''}\n\n" + "".join(lines) + f"\n{md_footer}"
+            page_key = hash_key(page)
+            if cache and not cache.output_changed(page_path, page_key):
+                continue
+            with output_files.open(page_path) as f:
+                f.write(page)
+            written = written + 1
+            if cache:
+                cache.outputs[page_path] = page_key
+    logger.info(f"Wrote {written} of {total} facet pages to {facets_dir}")
+    # Pages of values that are gone, or whose page name changed
+    for facet, _, _ in FACET_FIELDS:
+        pages = {f"{v['page']}.md" for v in facet_index[facet].values()}
+        for name in os.listdir(f"{facets_dir}/{facet}"):
+            if name.endswith(".md") and name not in pages:
+                logger.info(f"Removing stale facet page {facets_dir}/{facet}/{name}")
+                output_files.remove(f"{facets_dir}/{facet}/{name}")
+
+def write_mw_template(args, interviews):
+    """
+    Write the MediaWiki template that converts an interview id into a citation description.
+
+    Args:
+        args: Command line arguments object containing configuration
+        interviews (dict): Interviews keyed by string id
+    """
+    os.makedirs(os.path.dirname(args.mw_template_path), exist_ok=True)
+    with output_files.open(args.mw_template_path) as f:
+        logger.info(f"Writing id-to-description mediawiki template switch code to {f.name}")
+        f.write('<includeonly>{{TLlink|https://www.theoryland.com/intvmain.php?i&equals;{{{1}}}{{#if:{{{2|}}}|&#35;{{{2}}}}}|{{#if:{{{3|}}}|{{{3}}}|{{#switch:{{{1|}}}\n')
+        ids = []
+        for i in interviews.values():
+            ids.append(i.id)
+        ids.sort()
+        missing = 0
+        for id in ids:
+            interview = interviews[str(id)]
+            if not (interview.title or interview.date):
+                missing = missing + 1
+                continue
+            title = interview.title
+            if title is None:
+                title = interview.id
+            line = f"  | {interview.id}={title}" + (f", {{{{Date|{datetime.strftime(interview.date, '%Y %b %d')}}}}}" if interview.date else "")
+            f.write(line + "\n")
+        f.write("""  | Theoryland Interview &#35;{{{1}}}}}}}{{#if:{{{2|}}}|&nbsp;- Q{{{2}}}}}}}</includeonly><noinclude>{{Documentation}}
+[[Category:Utility templates]]</noinclude>\n""")
+        logger.info(f"  Skipped {missing} entries with no title and no date")
+
+class VerifyTask:
+    """
+    One interview to verify, together with the source HTML file it was parsed from.
+
+    Attributes:
+        file (Path): Source HTML file, raw in direct mode and normalized otherwise
+        interview (Interview): The interview as it is written to the archives
+    """
+    __slots__ = ('file', 'interview')
+
+    def __init__(self, file, interview):
+        self.file = file
+        self.interview = interview
+
+    def __str__(self):
+        return str(self.file)
+
+def verify_interviews(args, interviews, cache, profiler):
+    """
+    Verify every interview against its source HTML file and write the report.
+
+    Interviews are verified on the process pool when more than one job is
+    requested. With a build cache, the result for an interview is reused as
+    long as neither its source file nor the interview itself changed.
+
+    Args:
+        args: Command line arguments object containing configuration
+        interviews (dict): Interviews keyed by string id
+        cache (BuildCache): Build cache holding previous results, or None
+        profiler (Profiler): Collects per-file timings
+
+    Returns:
+        int: Number of interviews with problems
+    """
+    source_dir = Path(args.raw_html_dir if args.direct else args.normalize_dir)
+    sources = {}
+    for f in list(source_dir.glob("*.html")) + list(source_dir.glob("*.htm")):
+        match = re.search(r'^(\d+)\.html{0,1}$', f.name)
+        if match:
+            sources[match.group(1)] = f
+    results = {}  # Interview id to list of problems
+    keys = {}
+    tasks = []
+    for k, interview in interviews.items():
+        if k not in sources:
+            results[k] = [f"No source HTML file found in {source_dir}"]
+            continue
+        if cache:
+            keys[k] = hash_key(cache.file_hash(sources[k]), interview.toJSON())
+            if k in cache.verified and cache.verified[k][0] == keys[k]:
+                results[k] = cache.verified[k][1]
+                continue
+        tasks.append(VerifyTask(sources[k], interview))
+    logger.info(f"{len(interviews) - len(tasks)} interviews verified by a previous run")
+    checked = iter_stage(args, verify_interview, tasks, f"Verifying {len(tasks)} interviews", profiler)
+    for task, problems in zip(tasks, checked):
+        results[str(task.interview.id)] = problems
+    # Let the stage finish its progress output and shut its workers down
+    next(checked, None)
+    if cache:
+        cache.verified = {k: (keys[k], results[k]) for k in keys}
+    failed = [k for k in interviews if results[k]]
+    dirname = os.path.dirname(args.verify_report)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    with open(args.verify_report, 'w', encoding='utf-8') as f:
+        logger.info(f"Writing verification report to {f.name}")
+        f.write(f"Verified {len(interviews)} interviews, {len(failed)} with differences\n")
+        for k in failed:
+            f.write(f"\nInterview #{k} ({sources.get(k, 'no source file')})\n")
+            for problem in results[k]:
+                f.write("  " + problem.replace("\n", "\n    ") + "\n")
+    if failed:
+        logger.warning(f"Verification found differences in {len(failed)} of {len(interviews)} interviews; see {args.verify_report}")
+    else:
+        logger.info(f"Verified {len(interviews)} interviews")
+    return len(failed)
+
+def collapse_whitespace(text):
+    """
+    Collapse runs of whitespace to single spaces and strip the ends.
+
+    Args:
+        text (str): Text to collapse, or None
+
+    Returns:
+        str: The collapsed text, or None if text was None
+    """
+    return " ".join(text.split()) if text is not None else None
+
+def html_text(elements):
+    """
+    Get the visible text of some HTML elements, including image alt texts.
+
+    Args:
+        elements (list): Tags and strings, in document order
+
+    Returns:
+        str: The text, with whitespace collapsed
+    """
+    parts = []
+    for element in elements:
+        nodes = [element] if element.name is None else [element] + list(element.descendants)
+        for node in nodes:
+            if node.name is None:
+                if isinstance(node, NavigableString) and not isinstance(node, PreformattedString):
+                    parts.append(str(node))
+            elif node.name == 'img' and node.get('alt'):
+                parts.append(f" {node['alt']} ")
+    return collapse_whitespace("".join(parts))
+
+def markdown_text(content):
+    """
+    Reduce the Markdown of an entry to its visible text.
+
+    Link and image targets and backslash escapes are removed, leaving the text a
+    reader would see. Emphasis markers and other punctuation are left alone, since
+    only words are compared.
+
+    Args:
+        content (str): Entry Markdown
+
+    Returns:
+        str: The visible text
+    """
+    text = re.sub(r'\]\((?:[^()\s]|\([^()]*\))*(?:\s+"[^"]*")?\)', ']', content or "")
+    return re.sub(r'\\(.)', '\\1', text)
+
+def word_diff(expected, actual, what):
+    """
+    Compare the words of two texts.
+
+    Args:
+        expected (str): Text from the source HTML
+        actual (str): Text from the parsed interview
+        what (str): Description of the compared item, for the report
+
+    Returns:
+        list[str]: A problem with a word diff if the words differ, otherwise empty
+    """
+    expected_words = re.findall(r'\w+', expected or "")
+    actual_words = re.findall(r'\w+', actual or "")
+    if expected_words == actual_words:
+        return []
+    diff = list(difflib.unified_diff(expected_words, actual_words, "source", "parsed", n=2, lineterm=''))
+    if len(diff) > 40:
+        diff = diff[:40] + [f"... {len(diff) - 40} more lines"]
+    return [f"{what} differs:\n" + "\n".join(diff)]
+
+def verify_interview(args, task):
+    """
+    Compare one parsed interview against its source HTML page.
+
+    The page is read again and its summary fields, links, entries and tags are
+    extracted with simple, tolerant lookups that do not share code with
+    parse_interview. The visible text of each is compared with what the
+    interview holds. Entry text is compared word for word against the entry
+    Markdown, so Markdown formatting does not count as a difference but missing,
+    extra or changed words do.
+
+    Args:
+        args: Command line arguments object containing configuration
+        task (VerifyTask): Interview and its source file
+
+    Returns:
+        list[str]: Description of each difference found; empty if the interview matches
+    """
+    interview = task.interview
+    logger.debug("Verifying interview %s against %s", interview.id, task.file)
+    with open(task.file, 'r', encoding='utf-8') as f:
+        html_content = f.read().replace('&#8232;', '')
+    if args.direct:
+        soup = BeautifulSoup(html_content, args.html_parser, parse_only=SoupStrainer('div', class_='body-column-main'))
+    else:
+        soup = BeautifulSoup(html_content, 'html.parser')
+    problems = []
+    summary = soup.find('div', class_='intv-summary')
+    if summary is None:
+        return ["Source has no div.intv-summary"]
+
+    header = summary.find_previous_sibling('h3')
+    title = html_text([c for c in header.children if c.name != 'a']) if header else ""
+    title = re.sub(r'^:\s*', '', title) or None
+    if title != collapse_whitespace(interview.title):
+        problems.append(f"Title differs: source {title!r}, parsed {interview.title!r}")
+
+    sections = {}
+    label = None
+    for child in summary.children:
+        if child.name == 'h4':
+            label = html_text([child]).lower()
+            sections[label] = []
+        elif label is not None and child.name is not None:
+            sections[label].append(child)
+    for label in sections:
+        if label not in ('entries', 'date', 'type', 'location', 'bookstore', 'tourcon', 'reporter', 'links'):
+            problems.append(f"Summary field {label!r} is not captured")
+    count = html_text(sections.get('entries', []))
+    if count != str(interview.entryCount):
+        problems.append(f"Entry count differs: source {count!r}, parsed {interview.entryCount!r}")
+    date = html_text(sections['date']) if 'date' in sections else ""
+    year = re.search(r'\d{4}', date)
+    if (interview.date.year if interview.date else None) != (int(year.group(0)) if year else None):
+        problems.append(f"Date differs: source {date!r}, parsed {interview.date}")
+    for label, name in (('type', 'entryType'), ('location', 'location'), ('bookstore', 'bookStore'), ('tourcon', 'tourCon'), ('reporter', 'reporter')):
+        expected = html_text(sections[label]) if label in sections else None
+        if expected != collapse_whitespace(getattr(interview, name)):
+            problems.append(f"{label.capitalize()} differs: source {expected!r}, parsed {getattr(interview, name)!r}")
+    links = []
+    for element in sections.get('links', []):
+        for a in [element] if element.name == 'a' else element.find_all('a'):
+            links.append((a.get('href'), html_text([a])))
+    parsed_links = [(link['href'], collapse_whitespace(link['text'])) for link in interview.links or []]
+    if links != parsed_links:
+        problems.append(f"Links differ: source {links}, parsed {parsed_links}")
+
+    entry_list = soup.find('div', class_='intv-entry-list')
+    entry_lis = entry_list.find('ul').find_all('li', recursive=False) if entry_list and entry_list.find('ul') else []
+    entries = interview.entries or []
+    if len(entry_lis) != len(entries):
+        problems.append(f"Number of entries differs: source {len(entry_lis)}, parsed {len(entries)}")
+    for entry_i, (entry_li, entry) in enumerate(zip(entry_lis, entries), start=1):
+        entry_data = entry_li.find('div', class_='entry-data')
+        if entry_data is None:
+            problems.append(f"Entry {entry_i} has no div.entry-data in the source")
+            continue
+        body = []
+        tags = []
+        for child in entry_data.children:
+            if child.name == 'h4' and html_text([child]) == 'Tags':
+                tags = [html_text([b]) for b in entry_data.find_all('button', class_='lk-search-tag')]
+                break
+            body.append(child)
+        problems.extend(word_diff(html_text(body), markdown_text(entry.content), f"Entry {entry_i} text"))
+        if tags != entry.tags:
+            problems.append(f"Entry {entry_i} tags differ: source {tags}, parsed {entry.tags}")
+    return problems
+
+MW_LUA_MODULE = """-- Wiki page: Module:TIDB
+-- Generated by convert_all_interviews.py; do not edit.
+-- Converts a Theoryland interview id into its citation description, using the
+-- table in Module:TIDB/data. mw.loadData() loads that table once per page
+-- render, however many citations the page has.
+local p = {}
+
+function p.description(frame)
+	local id = mw.text.trim(frame.args[1] or '')
+	local interview = mw.loadData('Module:TIDB/data')[tonumber(id)]
+	if not interview then
+		return 'Theoryland Interview &#35;' .. id
+	end
+	if interview.date then
+		return interview.title .. ', ' .. frame:expandTemplate{ title = 'Date', args = { interview.date } }
+	end
+	return interview.title
+end
+
+return p
+"""
+
+STATIC_SEARCH_CLIENT = """// Generated by convert_all_interviews.py; do not edit.
+// Searches the static index in this directory, fetching only the shards that
+// hold the query terms. Every term must occur in an entry for it to match, and
+// matches are ranked by term count weighted by term rarity.
+//
+//   const results = await TIDBSearch.search("asha'man gateway", "./search/");
+//   // [{interview: 812, entry: 4, title: "...", score: 3.2, url: "./search/../t-812/4"}, ...]
+var TIDBSearch = (function () {
+  var cache = {};
+
+  function load(url) {
+    if (!cache[url]) {
+      cache[url] = fetch(url).then(function (response) {
+        if (!response.ok) {
+          throw new Error(url + ": " + response.status);
+        }
+        return response.json();
+      });
+    }
+    return cache[url];
+  }
+
+  function terms(text, minLength) {
+    var words = text.normalize("NFKD").replace(/[^\\x00-\\x7f]/g, "").toLowerCase().match(/[a-z0-9]+/g) || [];
+    return words.filter(function (word, i) {
+      return word.length >= minLength && words.indexOf(word) === i;
+    });
+  }
+
+  async function postings(base, manifest, term) {
+    var prefix = term.slice(0, manifest.prefixLength);
+    if (manifest.shards.indexOf(prefix) < 0) {
+      return new Map();
+    }
+    var flat = (await load(base + prefix + ".json"))[term] || [];
+    var result = new Map();
+    var id = 0;
+    for (var i = 0; i < flat.length; i += 3) {
+      id += flat[i];
+      result.set(id + "/" + flat[i + 1], flat[i + 2]);
+    }
+    return result;
+  }
+
+  async function search(query, base) {
+    base = base || "./search/";
+    var manifest = await load(base + "index.json");
+    var queryTerms = terms(query, manifest.minTermLength);
+    if (queryTerms.length === 0) {
+      return [];
+    }
+    var lists = await Promise.all(queryTerms.map(function (term) {
+      return postings(base, manifest, term);
+    }));
+    lists.sort(function (a, b) { return a.size - b.size; });
+    var results = [];
+    lists[0].forEach(function (count, key) {
+      var score = 0;
+      for (var i = 0; i < lists.length; i++) {
+        if (!lists[i].has(key)) {
+          return;
+        }
+        score += lists[i].get(key) * Math.log(1 + manifest.entries / lists[i].size);
+      }
+      var parts = key.split("/");
+      results.push({
+        interview: Number(parts[0]),
+        entry: Number(parts[1]),
+        title: manifest.titles[parts[0]] || null,
+        score: score,
+        url: base + "../t-" + key,
+      });
+    });
+    results.sort(function (a, b) { return b.score - a.score || a.interview - b.interview || a.entry - b.entry; });
+    return results;
+  }
+
+  return { search: search };
+})();
+"""
+
+MW_LUA_TEMPLATE = """<includeonly>{{TLlink|https://www.theoryland.com/intvmain.php?i&equals;{{{1}}}{{#if:{{{2|}}}|&#35;{{{2}}}}}|{{#if:{{{3|}}}|{{{3}}}|{{#invoke:TIDB|description|{{{1|}}}}}}}{{#if:{{{2|}}}|&nbsp;- Q{{{2}}}}}}}</includeonly><noinclude>{{Documentation}}
+[[Category:Utility templates]]</noinclude>
+"""
+
+def lua_string(value):
+    """
+    Quote a string as a Lua string literal.
+
+    Args:
+        value (str): String to quote
+
+    Returns:
+        str: Double-quoted Lua literal
+    """
+    value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+    return f'"{value}"'
+
+def write_mw_lua(args, interviews, data_path):
+    """
+    Write the Scribunto Lua data module, the Lua module and the template that uses them.
+
+    The template takes the same parameters and produces the same citation as
+    the switch template written by write_mw_template, but looks the interview
+    up in a Lua table instead of evaluating a case per interview.
+
+    Args:
+        args: Command line arguments object containing configuration
+        interviews (dict): Interviews keyed by string id
+        data_path (str): Path of the data module
+    """
+    os.makedirs(args.mw_lua_dir, exist_ok=True)
+    with output_files.open(data_path) as f:
+        logger.info(f"Writing id-to-description mediawiki Lua data module to {f.name}")
+        f.write("-- Wiki page: Module:TIDB/data\n-- Generated by convert_all_interviews.py; do not edit.\n")
+        f.write("-- Interview id to citation title and date, for Module:TIDB\nreturn {\n")
+        missing = 0
+        for id in sorted(i.id for i in interviews.values()):
+            interview = interviews[str(id)]
+            if not (interview.title or interview.date):
+                missing = missing + 1
+                continue
+            title = interview.title if interview.title is not None else str(interview.id)
+            fields = f"title = {lua_string(title)}"
+            if interview.date:
+                fields += f", date = {lua_string(datetime.strftime(interview.date, '%Y %b %d'))}"
+            f.write(f"\t[{interview.id}] = {{ {fields} }},\n")
+        f.write("}\n")
+        logger.info(f"  Skipped {missing} entries with no title and no date")
+    with output_files.open(f"{args.mw_lua_dir}/Module_TIDB.lua") as f:
+        f.write(MW_LUA_MODULE)
+    with output_files.open(f"{args.mw_lua_dir}/Template_TIDB.template") as f:
+        f.write(MW_LUA_TEMPLATE)
+
+def normalize_raw_html(args, file):
+    """
+    Normalize a raw HTML file using BeautifulSoup's prettify function.
+    
+    This function takes a raw HTML file and creates a normalized version
+    with consistent formatting and structure. The normalized files are
+    easier to parse reliably in subsequent processing steps.
+    
+    Args:
+        args: Command line arguments object containing configuration
+        file (Path): Path to the raw HTML file to normalize
+        
+    Note:
+        The function writes the normalized HTML to the normalize_dir
+        specified in the arguments, maintaining the same filename.
+    """
+    logger.debug("Normalizing raw HTML file %s", file)
+    # match = re.search(r'^(\d+)\.html{0,1}', os.path.basename(file))
+    # if not match:
+    #     raise RuntimeError(f"Filename does not match expected pattern: {file}")
+    with open(file, 'r', encoding='utf-8') as f:
+        html_content = f.read().replace('&#8232;', '')
+    soup = BeautifulSoup(html_content, 'html.parser')
+    with open(os.path.join(args.normalize_dir, os.path.basename(file)), 'w', encoding='utf-8') as f:
+        f.write(soup.prettify())
+
+def process_raw_html(args, file):
+    """
+    Parse a raw HTML file directly into an Interview, without a normalized file on disk.
+
+    Only the main body column of the page is built into a tree, which skips the
+    site navigation and other chrome around the interview. That column is then
+    normalized in memory exactly as normalize_raw_html does for the whole page,
+    so the result is identical to normalizing and then calling process_html.
+
+    Args:
+        args: Command line arguments object containing configuration
+        file (Path): Path to the raw HTML file to process
+
+    Returns:
+        Interview: A fully populated Interview object with all extracted data
+
+    Note:
+        If a normalize_dir is specified in the arguments, the normalized main
+        body column is also written there to help debug parsing problems.
+    """
+    logger.debug("Processing raw HTML file %s", file)
+    with open(file, 'r', encoding='utf-8') as f:
+        html_content = f.read().replace('&#8232;', '')
+    soup = BeautifulSoup(html_content, args.html_parser, parse_only=SoupStrainer('div', class_='body-column-main'))
+    normalized = soup.prettify()
+    if args.normalize_dir:
+        with open(os.path.join(args.normalize_dir, os.path.basename(file)), 'w', encoding='utf-8') as f:
+            f.write(normalized)
+    return parse_interview(file, BeautifulSoup(normalized, 'html.parser'))
+
+def process_html(args, file):
+    """
+    Process a normalized HTML file and extract structured interview data.
+
+    Args:
+        args: Command line arguments object containing configuration
+        file (Path): Path to the normalized HTML file to process
+
+    Returns:
+        Interview: A fully populated Interview object with all extracted data
+    """
+    logger.debug("Processing HTML file %s", file)
+    with open(os.path.join(args.normalize_dir, os.path.basename(file)), 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    return parse_interview(file, BeautifulSoup(html_content, 'html.parser'))
+
+def parse_interview(file, soup):
+    """
+    Extract structured interview data from the parsed HTML of an interview page.
+    
+    This is the core parsing function that extracts all interview information
+    from a normalized HTML file. It parses the specific HTML structure used
+    by the Theoryland Interview Database and creates Interview objects with
+    all metadata and entry content.
+    
+    The function expects a specific HTML structure:
+    - A main body column containing interview content
+    - An interview summary section with metadata fields
+    - An entry list section with individual Q&A entries
+    - Each entry contains an anchor, entry number, and entry data
+    
+    Args:
+        file (Path): Path to the HTML file the page was read from
+        soup (BeautifulSoup): The parsed, normalized HTML of the page
+        
+    Returns:
+        Interview: A fully populated Interview object with all extracted data
+        
+    Raises:
+        RuntimeError: If the HTML structure doesn't match expectations
+        
+    Note:
+        The function performs extensive validation of the HTML structure
+        and will raise detailed error messages if the format is unexpected.
+    """
+    match = re.search(r'^(.+)\.html{0,1}$', os.path.basename(file))
+    if not match:
+        raise RuntimeError(f"Filename does not match expected pattern: {file}")
+    result = Interview()
+    interview_id = int(match.group(1))
+    result.id = interview_id
     main_columns = soup.find_all('div', class_='body-column-main')
     if len(main_columns) != 1:
         raise RuntimeError(f"Expected exactly one main body column in file {file}, found {len(main_columns)}")
@@ -420,15 +3203,15 @@ def process_html(args, file):
     if len(summary) != 1:
         raise RuntimeError(f"Expected exactly one div.intv-summary in file {file}, found {len(summary)}")
 
-    logger.debug(f"Parsing summary for file {file}")
+    logger.debug("Parsing summary for file %s", file)
     summary = list(summary)[0]
-    logger.debug(f"Summary: {summary}")
+    logger.debug("Summary: %s", summary)
     summary_ch = summary.children
     
     # Define the expected metadata fields and their properties
     field_list = [ SummaryField(name="entries", pyName="entryCount", required=True), SummaryField(name="date", required=False),
         SummaryField(name="type", pyName="entryType", required=False, plainString=True), SummaryField(name="location", required=False, plainString=True),
-        SummaryField(name="bookstore", required=False, plainString=True), SummaryField(name="tourcon", required=False, plainString=True),
+        SummaryField(name="bookstore", pyName="bookStore", required=False, plainString=True), SummaryField(name="tourcon", pyName="tourCon", required=False, plainString=True),
         SummaryField(name="reporter", required=False, plainString=True), SummaryField(name="links", required=False) ]
     field_set = {}
     for field in field_list:
@@ -441,12 +3224,12 @@ def process_html(args, file):
     
     # Parse summary section children to extract metadata fields
     for child in summary_ch:
-        logger.debug(f"Summary child: {child}")
+        logger.debug("Summary child: %s", child)
         if child.name == 'h4':
             if not child.string:
                 raise RuntimeError(f"Unexpected empty h4 in file {file}: {summary}")
             mode = child.string.strip().lower()
-            logger.debug(f"Switching to {mode} mode")
+            logger.debug("Switching to %s mode", mode)
             mode_h4 = child
             field_key = mode_h4.string.strip().lower()
         elif mode == None:
@@ -454,7 +3237,7 @@ def process_html(args, file):
                 continue
             raise RuntimeError(f"Unexpected content {child} in summary before any h4 in file {file}: {summary}")
         elif mode == "links":
-            logger.debug(f"Child links found")
+            logger.debug("Child links found")
             if not field_key in fields.keys():
                 fields[field_key] = []
             if child.name == None:
@@ -479,9 +3262,9 @@ def process_html(args, file):
                 continue
             else:
                 raise RuntimeError(f"Unexpected content {child.name} in summary in file {file}: {summary}")
-    logger.debug(f"Parsing extra paragraphs for file {file} (id={result.id})")
+    logger.debug("Parsing extra paragraphs for file %s (id=%s)", file, result.id)
     for par in extra_paragraphs:
-        logger.debug(f"{file} (id={result.id}): {par}")
+        logger.debug("%s (id=%s): %s", file, result.id, par)
         parchildren = list(par.children)
         if par.name == 'p':
             for parchild in parchildren:
@@ -503,9 +3286,9 @@ def process_html(args, file):
     for k, v in fields.items():
         field = field_set[k]
         if field.plainString:
-            result.__dict__[field.pyName] = v.string.strip()
+            setattr(result, field.pyName, v.string.strip())
         else:
-            result.__dict__[field.pyName] = v
+            setattr(result, field.pyName, v)
     result.entryCount = int(result.entryCount.string.strip())
     date = result.date
     result.date = None
@@ -539,7 +3322,7 @@ def process_html(args, file):
         links = []
         for link in links_a:
             if not link.string:
-                logger.warning(f"Link with no text found in file {file}: {link}")
+                logger.warning("Link with no text found in file %s: %s", file, link)
             if 'href' not in link.attrs:
                 raise RuntimeError(f"Link with no href found in file {file}: {result.links}")
             links.append({"href": link.attrs['href'], "text": link.string.strip() if link.string else ""})
@@ -572,7 +3355,7 @@ def process_html(args, file):
         raise RuntimeError(f"Expected exactly one entry list ul in file {file}, found {len(entry_list_ul)}")
     result.entries = []
 
-    logger.debug(f"Parsing summary for file {file}")
+    logger.debug("Parsing summary for file %s", file)
     for entry_li in entry_list_ul[0].children:
         if entry_li.name == 'li':
             result.entries.append(InterviewEntry())
@@ -638,8 +3421,8 @@ def process_html(args, file):
                             for tag_button in tag_buttons:
                                 if 'class' not in tag_button.attrs or len(tag_button.attrs['class']) != 1 or tag_button.attrs['class'][0] != 'lk-search-tag':
                                     raise RuntimeError(f"Entry li.div<entry-data>.h4 Tags div.form contains non-lk-search-tag button in file {file}: {tag_button}")
-                                # result.entries[len(result.entries)-1].tags.append(tag_button.text.strip())
-                result.entries[len(result.entries)-1].content = md(str(entry_li_c))
+                                result.entries[len(result.entries)-1].tags.append(tag_button.text.strip())
+                result.entries[len(result.entries)-1].content = markdown_converter.convert_tag(entry_li_c)
             else:
                 raise RuntimeError(f"Entry li[2] with unexpected name {entry_li_c.name} found in file {file}: {entry_li}")
             entry_li_c = next(entry_li.children)
@@ -650,8 +3433,8 @@ def process_html(args, file):
         else:
             raise RuntimeError(f"Non-li element in entry list in file {file}: {entry_li}")
 
-    logger.debug(f"Processed file {file}")
-    logger.debug(f"Result: {result}")
+    logger.debug("Processed file %s", file)
+    logger.debug("Result: %s", result)
     return result
 
 if __name__ == "__main__":
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# Copyright 2025 ncsuandrew12
+# Modifications Copyright to their individual contributors
+# Licensed under the MIT License
+# SPDX-License-Identifier: MIT
+"""
+Theoryland Interview Database Downloader
+
+This script downloads the raw HTML page of every interview in the Theoryland
+Interview Database so that it can be processed by convert_all_interviews.py.
+
+Downloads are made politely and incrementally:
+1. Requests are limited by a token bucket (average rate and burst) and a
+   maximum number of requests in flight at once. By default one request is
+   made every three seconds, one at a time; faster rates must be asked for
+   with --rate and --max-concurrency
+2. The ETag and Last-Modified headers of every page are stored in a manifest,
+   and later syncs make conditional requests so unchanged pages are not refetched
+3. Failed requests are retried with exponential backoff
+4. Progress is checkpointed to the manifest, so an interrupted sync resumes
+   where it stopped instead of starting over
+5. After the known interviews are checked, ids above the highest known one are
+   probed until several in a row do not exist, so new interviews are discovered
+
+Dependencies:
+    None beyond the Python standard library
+
+Author: ncsuandrew12
+License: MIT
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger("tidbd")
+
+# 1184 was the highest ID number at the time the original download script was created.
+DEFAULT_HIGHEST_ID = 1184
+# Marker present in every page that actually contains an interview
+INTERVIEW_MARKER = b'intv-entry-list'
+
+class TokenBucket:
+    """
+    Rate limiter allowing an average number of requests per second with short bursts.
+
+    Attributes:
+        rate (float): Tokens added per second
+        burst (int): Maximum number of tokens that can accumulate
+        tokens (float): Tokens currently available
+        updated (float): Monotonic time of the last refill
+        lock (asyncio.Lock): Serializes waiters so tokens are handed out in order
+    """
+    rate = None
+    burst = None
+    tokens = None
+    updated = None
+    lock = None
+
+    def __init__(self, rate, burst):
+        """
+        Initialize a full TokenBucket.
+
+        Args:
+            rate (float): Tokens added per second
+            burst (int): Maximum number of tokens that can accumulate
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Wait until a token is available and take it.
+        """
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class DownloadManifest:
+    """
+    Persistent record of every page downloaded and of the sync in progress.
+
+    Attributes:
+        path (Path): Location of the manifest file
+        sync_id (str): Identifier of the current sync, reused when resuming
+        complete (bool): Whether the current sync finished
+        highest_id (int): Highest interview id known to exist
+        pages (dict): Interview id (as a string) to the stored response metadata
+    """
+    path = None
+    sync_id = None
+    complete = None
+    highest_id = None
+    pages = None
+
+    def __init__(self, path):
+        """
+        Load the manifest from disk, or start an empty one if it is missing.
+
+        Args:
+            path (str): Location of the manifest file
+        """
+        self.path = Path(path)
+        self.sync_id = None
+        self.complete = True
+        self.highest_id = None
+        self.pages = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.sync_id = data.get("syncId")
+            self.complete = data.get("complete", True)
+            self.highest_id = data.get("highestId")
+            self.pages = data.get("pages", {})
+
+    def save(self):
+        """
+        Write the manifest to disk, replacing the previous one atomically.
+        """
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"syncId": self.sync_id, "complete": self.complete, "highestId": self.highest_id, "pages": self.pages}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+class Downloader:
+    """
+    Downloads interview pages concurrently, politely and incrementally.
+
+    Blocking HTTP requests are made with urllib on worker threads, while asyncio
+    schedules them under the rate limit and the concurrency limit.
+
+    Attributes:
+        args: Command line arguments object containing configuration
+        manifest (DownloadManifest): Manifest recording downloaded pages
+        bucket (TokenBucket): Request rate limiter
+        semaphore (asyncio.Semaphore): Limit on requests in flight
+        counts (dict): Number of pages per fetch outcome
+        since_save (int): Pages checked since the manifest was last saved
+    """
+    args = None
+    manifest = None
+    bucket = None
+    semaphore = None
+    counts = None
+    since_save = None
+
+    def __init__(self, args, manifest):
+        """
+        Initialize a Downloader.
+
+        Args:
+            args: Command line arguments object containing configuration
+            manifest (DownloadManifest): Manifest recording downloaded pages
+        """
+        self.args = args
+        self.manifest = manifest
+        self.bucket = TokenBucket(args.rate, args.burst)
+        self.semaphore = asyncio.Semaphore(args.max_concurrency)
+        self.counts = {"new": 0, "changed": 0, "unchanged": 0, "missing": 0, "skipped": 0, "failed": 0}
+        self.since_save = 0
+
+    def request(self, url, headers):
+        """
+        Make one blocking HTTP GET request.
+
+        Args:
+            url (str): URL to request
+            headers (dict): Request headers
+
+        Returns:
+            tuple: (status, response headers, body bytes)
+        """
+        req = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.args.timeout) as resp:
+                return resp.status, resp.headers, resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, b''
+
+    async def fetch(self, interview_id):
+        """
+        Fetch one interview page if it changed since the last sync, with retries.
+
+        Args:
+            interview_id (int): Interview id to fetch
+
+        Returns:
+            str: Outcome of the fetch: new, changed, unchanged, missing, skipped or failed
+        """
+        key = str(interview_id)
+        page = self.manifest.pages.get(key, {})
+        path = Path(self.args.output_dir) / f"{interview_id}.html"
+        if page.get("syncId") == self.manifest.sync_id:
+            # Already checked earlier in this (resumed) sync
+            return self.record("skipped")
+        headers = {"User-Agent": self.args.user_agent}
+        if path.exists() and not self.args.force:
+            if page.get("etag"):
+                headers["If-None-Match"] = page["etag"]
+            if page.get("lastModified"):
+                headers["If-Modified-Since"] = page["lastModified"]
+        url = self.args.url.format(id=interview_id)
+        for attempt in range(self.args.retries + 1):
+            await self.bucket.acquire()
+            async with self.semaphore:
+                logger.debug("Requesting %s", url)
+                try:
+                    status, resp_headers, body = await asyncio.to_thread(self.request, url, headers)
+                except (urllib.error.URLError, OSError) as e:
+                    status, resp_headers, body = None, {}, b''
+                    logger.warning(f"Request for interview {interview_id} failed: {e}")
+            if status == 304:
+                page["syncId"] = self.manifest.sync_id
+                self.manifest.pages[key] = page
+                return self.record("unchanged")
+            if status == 404 or (status == 200 and INTERVIEW_MARKER not in body):
+                self.manifest.pages[key] = {"syncId": self.manifest.sync_id, "missing": True}
+                return self.record("missing")
+            if status == 200:
+                digest = hashlib.sha256(body).hexdigest()
+                outcome = "new" if not path.exists() else ("unchanged" if page.get("sha256") == digest else "changed")
+                if outcome != "unchanged":
+                    tmp_path = path.with_name(path.name + ".tmp")
+                    with open(tmp_path, 'wb') as f:
+                        f.write(body)
+                    os.replace(tmp_path, path)
+                    logger.info(f"Downloaded interview {interview_id} ({outcome})")
+                self.manifest.pages[key] = {"syncId": self.manifest.sync_id, "sha256": digest,
+                                            "etag": resp_headers.get("ETag"), "lastModified": resp_headers.get("Last-Modified")}
+                return self.record(outcome)
+            if attempt < self.args.retries:
+                delay = self.args.backoff * (2 ** attempt) + random.uniform(0, self.args.backoff)
+                retry_after = resp_headers.get("Retry-After") if resp_headers else None
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+                logger.warning(f"Interview {interview_id} returned status {status}; retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        logger.error(f"Giving up on interview {interview_id} after {self.args.retries + 1} attempts")
+        return self.record("failed")
+
+    def record(self, outcome):
+        """
+        Count a fetch outcome and periodically checkpoint the manifest.
+
+        Args:
+            outcome (str): Outcome of the fetch
+
+        Returns:
+            str: The outcome, unchanged
+        """
+        self.counts[outcome] += 1
+        self.since_save += 1
+        if self.since_save >= self.args.checkpoint_every:
+            self.manifest.save()
+            self.since_save = 0
+        if not logger.isEnabledFor(logging.DEBUG) and sum(self.counts.values()) % 5 == 0:
+            print(".", end='', flush=True)
+        return outcome
+
+    async def fetch_all(self, ids):
+        """
+        Fetch a batch of interview pages concurrently.
+
+        Args:
+            ids (list[int]): Interview ids to fetch
+        """
+        await asyncio.gather(*[self.fetch(i) for i in ids])
+
+    def exists(self, interview_id):
+        """
+        Check whether an interview is known to exist.
+
+        Args:
+            interview_id (int): Interview id to check
+
+        Returns:
+            bool: True if the interview has been downloaded and was not missing when last checked
+        """
+        page = self.manifest.pages.get(str(interview_id))
+        return page is not None and not page.get("missing")
+
+    async def sync(self):
+        """
+        Check every known interview, then discover and download new ones.
+        """
+        highest = self.args.end or self.manifest.highest_id or DEFAULT_HIGHEST_ID
+        ids = list(range(self.args.start, highest + 1))
+        msg = f"Checking {len(ids)} interviews"
+        logger.info(msg)
+        if not logger.isEnabledFor(logging.DEBUG):
+            print(msg, end='', flush=True)
+        await self.fetch_all(ids)
+        existing = [i for i in ids if self.exists(i)]
+        if existing:
+            highest = max(existing)
+        if not self.args.end:
+            # Probe windows of ids above the highest known one until a whole window is missing
+            while self.args.discover > 0:
+                window = list(range(highest + 1, highest + 1 + self.args.discover))
+                await self.fetch_all(window)
+                found = [i for i in window if self.exists(i)]
+                if not found:
+                    break
+                highest = max(found)
+                logger.info(f"Discovered interviews up to {highest}")
+            self.manifest.highest_id = highest
+        if not logger.isEnabledFor(logging.DEBUG):
+            print("")
+
+def main():
+    """
+    Main entry point for the download script.
+
+    Parses command line arguments, resumes or starts a sync, and reports a
+    summary of what was downloaded. Exits non-zero if any page could not be
+    downloaded.
+    """
+    # Configured here rather than on import, so that importing this module has no side effects
+    logging.basicConfig(filename='tidbd.log', level=logging.INFO)
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+    parser = argparse.ArgumentParser(prog=__name__,
+                                     description="Download raw HTML files from the Theoryland Interview Database, fetching only pages that changed since the last sync.")
+    parser.add_argument('-o', '--output-dir', type=str, help='Directory to save raw HTML files to', default=".")
+    parser.add_argument('-m', '--manifest-path', type=str, help='Path to the download manifest (defaults to download-manifest.json in the output directory)')
+    parser.add_argument('-u', '--url', type=str, help='URL template for an interview page, with {id} for the interview id', default="https://www.theoryland.com/intvmain.php?i={id}")
+    parser.add_argument('-s', '--start', type=int, help='First interview id to check', default=1)
+    parser.add_argument('-e', '--end', type=int, help='Last interview id to check. Disables discovery of new interviews')
+    parser.add_argument('-d', '--discover', type=int, help='Number of consecutive missing ids above the highest known interview after which discovery stops (0 to disable)', default=5)
+    parser.add_argument('-r', '--rate', type=float, help='Average number of requests per second. The default of one request every three seconds is deliberately gentle on the site; raise it only if you know the server can take it', default=0.33)
+    parser.add_argument('-b', '--burst', type=int, help='Number of requests that may be made back to back before the rate limit applies', default=1)
+    parser.add_argument('-c', '--max-concurrency', type=int, help='Maximum number of requests in flight at once. Defaults to one; raise it only together with --rate', default=1)
+    parser.add_argument('-t', '--timeout', type=float, help='Request timeout in seconds', default=30)
+    parser.add_argument('-R', '--retries', type=int, help='Number of times to retry a failed request', default=3)
+    parser.add_argument('-B', '--backoff', type=float, help='Base delay in seconds before the first retry; doubled for every further retry', default=3)
+    parser.add_argument('-k', '--checkpoint-every', type=int, help='Save the manifest after this many pages', default=20)
+    parser.add_argument('-f', '--force', action='store_true', help='Refetch every page instead of making conditional requests')
+    parser.add_argument('-n', '--restart', action='store_true', help='Start a new sync even if the previous one was interrupted')
+    parser.add_argument('-a', '--user-agent', type=str, help='User-Agent header to send', default="wotwiki-tidb-downloader (+https://source.wot.wiki)")
+    parser.add_argument('-l', '--log-level', type=int, help='Set the logging level')
+    args = parser.parse_args()
+    if args.log_level:
+        logger.setLevel(args.log_level)
+        print(f"Log level set to {args.log_level}")
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest = DownloadManifest(args.manifest_path or os.path.join(args.output_dir, "download-manifest.json"))
+    if manifest.complete or args.restart or args.force:
+        manifest.sync_id = datetime.now(timezone.utc).isoformat()
+        manifest.complete = False
+        logger.info(f"Starting sync {manifest.sync_id}")
+        manifest.save()
+    else:
+        logger.info(f"Resuming interrupted sync {manifest.sync_id}")
+    downloader = Downloader(args, manifest)
+    try:
+        asyncio.run(downloader.sync())
+        manifest.complete = downloader.counts["failed"] == 0
+    finally:
+        manifest.save()
+    logger.info("Sync summary: " + ", ".join(f"{v} {k}" for k, v in downloader.counts.items()) + f"; highest interview id {manifest.highest_id}")
+    if downloader.counts["failed"]:
+        logger.error(f"{downloader.counts['failed']} interviews could not be downloaded; rerun to retry them")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# Copyright 2025 ncsuandrew12
+# Modifications Copyright to their individual contributors
+# Licensed under the Open Software License version 3.0
+# SPDX-License-Identifier: OSL-3.0
+"""
+Theoryland Interview Database Reader
+
+This module reads single interviews and entries out of the JSON archive
+written by convert_all_interviews.py without loading the whole archive.
+
+The converter writes an offset index next to the archive
+("theoryland interview database.offsets.json") giving the byte range of
+every interview and of every entry within it. The reader memory-maps the
+archive and decodes only the requested range, and keeps recently used
+interviews and entries in an LRU cache.
+
+Interviews and entries are returned as the decoded JSON objects, exactly as
+they appear in the archive (dates are "YYYY-MM-DD" strings). Cached objects
+are shared between callers, so they must not be modified.
+
+Usage as a library:
+    with InterviewReader("theoryland interview database.json") as reader:
+        interview = reader.interview(812)
+        entry = reader.entry(812, 4)
+
+Usage from the command line:
+    python interview_reader.py 812      # print interview #812
+    python interview_reader.py 812 4    # print entry 4 of interview #812
+
+Dependencies:
+    None beyond the Python standard library
+
+Author: ncsuandrew12
+License: OSSL-3.0
+"""
+
+import argparse
+import json
+import mmap
+import os
+import sys
+
+from functools import lru_cache
+
+def offsets_path_for(archive_path):
+    """
+    Get the path of the offset index the converter writes for an archive.
+
+    Args:
+        archive_path (str): Path of the JSON archive
+
+    Returns:
+        str: Path of the offset index
+    """
+    root, ext = os.path.splitext(str(archive_path))
+    return f"{root}.offsets{ext}"
+
+class InterviewReader:
+    """
+    Random-access reader over the JSON archive.
+
+    Attributes:
+        archive_path (str): Path of the JSON archive
+        offsets (dict): Interview id (as a string) to [start, end, [[entry start, entry end], ...]]
+    """
+    archive_path = None
+    offsets = None
+    _map = None
+
+    def __init__(self, archive_path, offsets_path=None, cache_size=1024):
+        """
+        Open the archive and load its offset index.
+
+        Args:
+            archive_path (str): Path of the JSON archive
+            offsets_path (str, optional): Path of the offset index (defaults to the one next to the archive)
+            cache_size (int, optional): Number of interviews, and separately of entries, to keep decoded
+
+        Raises:
+            FileNotFoundError: If the archive or the offset index does not exist
+            RuntimeError: If the offset index was not written for this archive
+        """
+        self.archive_path = str(archive_path)
+        if offsets_path is None:
+            offsets_path = offsets_path_for(archive_path)
+        with open(offsets_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.offsets = index['interviews']
+        self._file = open(self.archive_path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size != index['archiveSize']:
+            self._file.close()
+            raise RuntimeError(f"Offset index {offsets_path} does not match archive {self.archive_path}: "
+                               f"expected {index['archiveSize']} bytes, found {size}")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.interview = lru_cache(maxsize=cache_size)(self._read_interview)
+        self.entry = lru_cache(maxsize=cache_size)(self._read_entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, id):
+        return str(id) in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def ids(self):
+        """
+        Get the id of every interview in the archive.
+
+        Returns:
+            list[int]: Interview ids, in archive order
+        """
+        return [int(id) for id in self.offsets]
+
+    def entry_count(self, id):
+        """
+        Get the number of entries in an interview without decoding it.
+
+        Args:
+            id (int): Interview id
+
+        Returns:
+            int: Number of entries
+
+        Raises:
+            KeyError: If there is no such interview
+        """
+        return len(self.offsets[str(id)][2])
+
+    def _decode(self, start, end):
+        return json.loads(self._map[start:end])
+
+    def _read_interview(self, id):
+        """
+        Decode one interview; called through the cached interview() method.
+
+        Args:
+            id (int): Interview id
+
+        Returns:
+            dict: The interview object
+
+        Raises:
+            KeyError: If there is no such interview
+        """
+        start, end, _ = self.offsets[str(id)]
+        return self._decode(start, end)
+
+    def _read_entry(self, id, entry):
+        """
+        Decode one entry; called through the cached entry() method.
+
+        Args:
+            id (int): Interview id
+            entry (int): Entry number, starting at 1
+
+        Returns:
+            dict: The entry object
+
+        Raises:
+            KeyError: If there is no such interview or entry
+        """
+        entries = self.offsets[str(id)][2]
+        if entry < 1 or entry > len(entries):
+            raise KeyError(f"Interview {id} has no entry {entry}")
+        start, end = entries[entry - 1]
+        return self._decode(start, end)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+def main():
+    """
+    Main entry point for the reader script.
+
+    Prints an interview, or a single entry of it, as JSON. Exits non-zero if
+    it does not exist.
+    """
+    parser = argparse.ArgumentParser(prog=__name__,
+                                     description="Print one interview or entry from the Theoryland Interview Database JSON archive.")
+    parser.add_argument('id', type=int, help='Interview id')
+    parser.add_argument('entry', type=int, nargs='?', help='Entry number; prints the whole interview if omitted')
+    parser.add_argument('-a', '--archive-path', type=str, help='Path to the JSON archive written by convert_all_interviews.py', default="../../docs/theoryland/interviews/theoryland interview database.json")
+    args = parser.parse_args()
+    with InterviewReader(args.archive_path) as reader:
+        try:
+            result = reader.interview(args.id) if args.entry is None else reader.entry(args.id, args.entry)
+        except KeyError:
+            print(f"Not found: interview {args.id}" + (f" entry {args.entry}" if args.entry is not None else ""), file=sys.stderr)
+            sys.exit(1)
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# Copyright 2025 ncsuandrew12
+# Modifications Copyright to their individual contributors
+# Licensed under the Open Software License version 3.0
+# SPDX-License-Identifier: OSL-3.0
+"""
+Theoryland Interview Database Search
+
+This script runs full-text queries against the search index written by
+convert_all_interviews.py with the --search-index-path option.
+
+Queries use SQLite FTS5 syntax:
+- Words must all appear: perrin wolf
+- Phrases are quoted: "dark one"
+- Boolean operators: mat OR perrin, rand NOT lews
+- Prefixes: balefir*
+
+Results are ranked by relevance (BM25) and shown with a snippet of the
+matching entry and a link to the original interview on Theoryland.
+
+Dependencies:
+    None beyond the Python standard library (SQLite must include FTS5)
+
+Author: ncsuandrew12
+License: OSSL-3.0
+"""
+
+import argparse
+import sqlite3
+import sys
+
+from pathlib import Path
+
+def search(db, query, limit):
+    """
+    Run a ranked full-text query against the search index.
+
+    Args:
+        db (sqlite3.Connection): Open connection to the search index
+        query (str): FTS5 query string
+        limit (int): Maximum number of results to return
+
+    Returns:
+        list[sqlite3.Row]: Matching entries, best match first
+    """
+    return db.execute("""SELECT interview, entry, title, date, entryType, location, reporter,
+            snippet(entries, 0, '[', ']', '...', 24) AS snippet, bm25(entries) AS score
+        FROM entries WHERE entries MATCH ? ORDER BY score LIMIT ?""", (query, limit)).fetchall()
+
+def format_result(row):
+    """
+    Format one search result for display.
+
+    Args:
+        row (sqlite3.Row): Result row returned by search()
+
+    Returns:
+        str: Heading with the interview summary, the snippet and a link to the entry
+    """
+    heading = f"Interview #{row['interview']}" + (f": {row['title']}" if row['title'] else "") + f", Entry #{row['entry']}"
+    details = [d for d in (row['date'], row['entryType'], row['location'], row['reporter']) if d]
+    if details:
+        heading += f" ({', '.join(details)})"
+    snippet = " ".join(row['snippet'].split())
+    return f"{heading}\n    {snippet}\n    https://www.theoryland.com/intvmain.php?i={row['interview']}#{row['entry']}\n"
+
+def main():
+    """
+    Main entry point for the search script.
+
+    Parses command line arguments, runs the query and prints the results.
+    Exits non-zero if the index cannot be opened, the query is invalid or
+    nothing matched.
+    """
+    parser = argparse.ArgumentParser(prog=__name__,
+                                     description="Search the Theoryland Interview Database full-text index.")
+    parser.add_argument('query', type=str, nargs='+', help='FTS5 query; multiple arguments are joined with spaces')
+    parser.add_argument('-i', '--index-path', type=str, help='Path to the search index written by convert_all_interviews.py', default="./processed/tidb-search.sqlite")
+    parser.add_argument('-n', '--limit', type=int, help='Maximum number of results to show', default=20)
+    args = parser.parse_args()
+    try:
+        db = sqlite3.connect(Path(args.index_path).resolve().as_uri() + "?mode=ro", uri=True)
+    except sqlite3.OperationalError as e:
+        print(f"Cannot open search index {args.index_path}: {e}", file=sys.stderr)
+        sys.exit(2)
+    db.row_factory = sqlite3.Row
+    try:
+        results = search(db, " ".join(args.query), args.limit)
+    except sqlite3.OperationalError as e:
+        print(f"Invalid query: {e}", file=sys.stderr)
+        sys.exit(2)
+    finally:
+        db.close()
+    for row in results:
+        print(format_result(row))
+    print(f"{len(results)} results" + (" (limit reached)" if len(results) == args.limit else ""))
+    if not results:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# Copyright 2025 ncsuandrew12
+# Modifications Copyright to their individual contributors
+# Licensed under the Open Software License version 3.0
+# SPDX-License-Identifier: OSL-3.0
+"""
+Theoryland Interview Database API Server
+
+This script serves the JSON archive written by convert_all_interviews.py over
+a small read-only HTTP API, so that tools such as the citation bot and wiki
+gadgets can share one warm process instead of loading the archive themselves.
+
+Endpoints (all GET, all JSON):
+- /interviews: Summaries (every field but the entries) of all interviews.
+  Filter with query parameters, which must all match: year, entryType,
+  location, bookStore, tourCon, reporter and tag. For example,
+  /interviews?year=2005&entryType=Book%20Signing&reporter=Terez
+- /interviews/{id}: One interview, with its entries
+- /interviews/{id}/entries/{n}: One entry of an interview
+
+The archive is loaded once into the converter's Interview model, along with
+indexes for the filters. Responses are rendered on first use and kept in an
+LRU cache together with their ETag; requests with a matching If-None-Match
+get a 304 reply. The archive is reloaded in the background
+whenever it changes on disk.
+
+Dependencies:
+    - beautifulsoup4, markdownify: Required by convert_all_interviews.py
+
+Author: ncsuandrew12
+License: OSSL-3.0
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+
+from collections import OrderedDict
+from http import HTTPStatus
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import convert_all_interviews as tidbc
+
+logger = logging.getLogger("tidbs")
+
+# Query parameters accepted by /interviews; each is an Interview attribute, except year and tag
+FILTERS = ("year", "entryType", "location", "bookStore", "tourCon", "reporter", "tag")
+
+def etag(body):
+    """
+    Compute the ETag of a response body.
+
+    Args:
+        body (bytes): Response body
+
+    Returns:
+        str: Quoted strong ETag
+    """
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+class Archive:
+    """
+    The interviews of one version of the JSON archive, with lookup indexes.
+
+    Attributes:
+        path (str): Path of the JSON archive
+        stat (tuple): (size, modification time) of the archive when it was loaded
+        interviews (dict): Interviews keyed by int id
+        index (dict): Filter name to value to set of interview ids
+    """
+    path = None
+    stat = None
+    interviews = None
+    index = None
+
+    def __init__(self, path):
+        """
+        Load the archive and build its indexes.
+
+        Args:
+            path (str): Path of the JSON archive
+        """
+        self.path = path
+        st = os.stat(path)
+        self.stat = (st.st_size, st.st_mtime_ns)
+        self.interviews = {int(k): v for k, v in tidbc.load_json(path).items()}
+        self.index = {name: {} for name in FILTERS}
+        for id, interview in self.interviews.items():
+            for entry in interview.entries or []:
+                for tag in entry.tags:
+                    self.index["tag"].setdefault(tag, set()).add(id)
+            if interview.date:
+                self.index["year"].setdefault(str(interview.date.year), set()).add(id)
+            for name in ("entryType", "location", "bookStore", "tourCon", "reporter"):
+                value = getattr(interview, name)
+                if value is not None:
+                    self.index[name].setdefault(value, set()).add(id)
+        logger.info(f"Loaded {len(self.interviews)} interviews from {path}")
+
+    def changed(self):
+        """
+        Check whether the archive file was replaced or modified since it was loaded.
+
+        Returns:
+            bool: True if the file's size or modification time differs
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return (st.st_size, st.st_mtime_ns) != self.stat
+
+    def filter(self, query):
+        """
+        Find the interviews matching every filter in a query.
+
+        Args:
+            query (dict): Filter name to required value
+
+        Returns:
+            list[int]: Matching interview ids, in increasing order
+        """
+        ids = None
+        for name, value in query.items():
+            matches = self.index[name].get(value, set())
+            ids = matches if ids is None else ids & matches
+        return sorted(self.interviews if ids is None else ids)
+
+def interview_body(interview):
+    """
+    Render the /interviews/{id} response body.
+
+    Args:
+        interview (Interview): Interview to render
+
+    Returns:
+        bytes: JSON of the interview
+    """
+    return json.dumps(interview.toDict()).encode('utf-8')
+
+def entry_body(interview, entry_i):
+    """
+    Render the /interviews/{id}/entries/{n} response body.
+
+    Args:
+        interview (Interview): Interview holding the entry
+        entry_i (int): Entry number, starting at 1
+
+    Returns:
+        bytes: JSON of the entry, with its interview id and entry number
+    """
+    data = {"interview": interview.id, "entry": entry_i}
+    data.update(interview.entries[entry_i - 1].toDict())
+    return json.dumps(data).encode('utf-8')
+
+def summary(interview):
+    """
+    Get the summary of an interview, as listed by /interviews.
+
+    Args:
+        interview (Interview): Interview to summarize
+
+    Returns:
+        dict: Every field of the interview except the entries
+    """
+    data = interview.toDict()
+    del data["entries"]
+    return data
+
+class InterviewServer:
+    """
+    HTTP/1.1 server for the interview API, with keep-alive connections.
+
+    Attributes:
+        args: Command line arguments object containing configuration
+        archive (Archive): The currently served archive
+        responses (OrderedDict): LRU cache of rendered responses, from cache key to (ETag, body)
+    """
+    args = None
+    archive = None
+    responses = None
+
+    def __init__(self, args):
+        self.args = args
+        self.archive = Archive(args.archive_path)
+        self.responses = OrderedDict()
+
+    def render(self, key, build):
+        """
+        Get a rendered response and its ETag from the LRU cache, rendering it if needed.
+
+        Args:
+            key (tuple): Cache key of the response
+            build: Function returning the response body
+
+        Returns:
+            tuple: (ETag, body)
+        """
+        cached = self.responses.get(key)
+        if cached is not None:
+            self.responses.move_to_end(key)
+            return cached
+        body = build()
+        cached = (etag(body), body)
+        self.responses[key] = cached
+        if len(self.responses) > self.args.cache_size:
+            self.responses.popitem(last=False)
+        return cached
+
+    def route(self, target):
+        """
+        Resolve a request target to a response.
+
+        Args:
+            target (str): Request target, i.e. path and query string
+
+        Returns:
+            tuple: (HTTP status, ETag or None, body)
+        """
+        archive = self.archive
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.strip('/').split('/')]
+        if parts == ["interviews"]:
+            query = dict(parse_qsl(url.query))
+            unknown = [name for name in query if name not in FILTERS]
+            if unknown:
+                return HTTPStatus.BAD_REQUEST, None, error_body(f"Unknown filter {unknown[0]}; filters are {', '.join(FILTERS)}")
+            key = ("list",) + tuple(sorted(query.items()))
+            return (HTTPStatus.OK,) + self.render(key, lambda: json.dumps(
+                [summary(archive.interviews[id]) for id in archive.filter(query)]).encode('utf-8'))
+        # str.isdigit() would also accept digits such as "²", which int() rejects
+        if len(parts) in (2, 4) and parts[0] == "interviews" and re.fullmatch(r"[0-9]+", parts[1]):
+            id = int(parts[1])
+            interview = archive.interviews.get(id)
+            if interview is None:
+                return HTTPStatus.NOT_FOUND, None, error_body(f"No interview {id}")
+            if len(parts) == 2:
+                return (HTTPStatus.OK,) + self.render(("interview", id), lambda: interview_body(interview))
+            if parts[2] == "entries" and re.fullmatch(r"[0-9]+", parts[3]):
+                entry_i = int(parts[3])
+                if not 1 <= entry_i <= len(interview.entries or []):
+                    return HTTPStatus.NOT_FOUND, None, error_body(f"Interview {id} has no entry {entry_i}")
+                return (HTTPStatus.OK,) + self.render(("entry", id, entry_i), lambda: entry_body(interview, entry_i))
+        return HTTPStatus.NOT_FOUND, None, error_body(f"Unknown path {url.path}")
+
+    async def handle(self, reader, writer):
+        """
+        Serve the requests of one connection until it is closed.
+
+        Args:
+            reader (asyncio.StreamReader): Connection input
+            writer (asyncio.StreamWriter): Connection output
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    self.respond(writer, HTTPStatus.BAD_REQUEST, None, error_body("Malformed request line"), False, False)
+                    break
+                keep_alive = headers.get('connection', '').lower() != 'close' if version == 'HTTP/1.1' \
+                    else headers.get('connection', '').lower() == 'keep-alive'
+                # Request bodies are never used, but must not be read as the next request
+                if 'transfer-encoding' in headers:
+                    keep_alive = False
+                elif 'content-length' in headers:
+                    try:
+                        await self.discard_body(reader, int(headers['content-length']))
+                    except ValueError:
+                        self.respond(writer, HTTPStatus.BAD_REQUEST, None, error_body("Malformed Content-Length"), False, False)
+                        break
+                if method not in ('GET', 'HEAD'):
+                    status, tag, body = HTTPStatus.METHOD_NOT_ALLOWED, None, error_body("Only GET and HEAD are supported")
+                else:
+                    status, tag, body = self.route(target)
+                if tag is not None and headers.get('if-none-match') == tag:
+                    status, body = HTTPStatus.NOT_MODIFIED, b''
+                logger.debug("%s %s %s", method, target, status.value)
+                self.respond(writer, status, tag, body, keep_alive, method == 'HEAD')
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def discard_body(reader, length):
+        """
+        Read and throw away a request body.
+
+        Args:
+            reader (asyncio.StreamReader): Connection input
+            length (int): Length of the body from the Content-Length header
+
+        Raises:
+            ValueError: If the length is negative
+            asyncio.IncompleteReadError: If the connection closes before the end of the body
+        """
+        if length < 0:
+            raise ValueError(f"Negative Content-Length {length}")
+        while length > 0:
+            chunk = await reader.readexactly(min(length, 65536))
+            length = length - len(chunk)
+
+    def respond(self, writer, status, tag, body, keep_alive, head_only):
+        headers = [f"HTTP/1.1 {status.value} {status.phrase}",
+                   "Content-Type: application/json; charset=utf-8",
+                   f"Content-Length: {len(body)}",
+                   "Cache-Control: no-cache",
+                   f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if tag is not None:
+            headers.append(f"ETag: {tag}")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode('latin-1'))
+        if not head_only and status != HTTPStatus.NOT_MODIFIED:
+            writer.write(body)
+
+    async def reload_when_changed(self):
+        """
+        Poll the archive and swap in a freshly loaded copy whenever it changes.
+
+        The archive is loaded in a thread so requests keep being served from
+        the old copy meanwhile. A failed load, e.g. of a half-written file,
+        keeps the old copy and is retried on the next poll.
+        """
+        while True:
+            await asyncio.sleep(self.args.reload_interval)
+            if not self.archive.changed():
+                continue
+            try:
+                archive = await asyncio.to_thread(Archive, self.args.archive_path)
+            except Exception as e:
+                logger.warning(f"Failed to reload {self.args.archive_path}: {e}")
+                self.archive.stat = None  # Retry on the next poll
+                continue
+            self.archive = archive
+            self.responses.clear()
+
+def error_body(message):
+    """
+    Render the body of an error response.
+
+    Args:
+        message (str): Description of the error
+
+    Returns:
+        bytes: JSON object with the message
+    """
+    return json.dumps({"error": message}).encode('utf-8')
+
+async def serve(args):
+    """
+    Load the archive and serve requests until interrupted.
+
+    Args:
+        args: Command line arguments object containing configuration
+    """
+    server = InterviewServer(args)
+    listener = await asyncio.start_server(server.handle, args.host, args.port)
+    reloader = asyncio.create_task(server.reload_when_changed()) if args.reload_interval > 0 else None
+    print(f"Serving {len(server.archive.interviews)} interviews on http://{args.host}:{args.port}/interviews")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if reloader:
+            reloader.cancel()
+
+def main():
+    """
+    Main entry point for the API server.
+
+    Parses command line arguments and runs the server until interrupted.
+    """
+    parser = argparse.ArgumentParser(prog=__name__,
+                                     description="Serve the Theoryland Interview Database JSON archive over a read-only HTTP API.")
+    parser.add_argument('-a', '--archive-path', type=str, help='Path to the JSON archive written by convert_all_interviews.py', default="../../docs/theoryland/interviews/theoryland interview database.json")
+    parser.add_argument('-H', '--host', type=str, help='Address to listen on', default="127.0.0.1")
+    parser.add_argument('-p', '--port', type=int, help='Port to listen on', default=8080)
+    parser.add_argument('-c', '--cache-size', type=int, help='Number of rendered responses to keep in memory', default=4096)
+    parser.add_argument('-r', '--reload-interval', type=float, help='Seconds between checks for a changed archive (0 to never reload)', default=5.0)
+    parser.add_argument('-l', '--log-level', type=int, help='Set the logging level')
+    args = parser.parse_args()
+    logging.basicConfig(filename='tidbs.log', level=logging.INFO)
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+    if args.log_level:
+        logger.setLevel(args.log_level)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("Stopped")
+
+if __name__ == "__main__":
+    main()
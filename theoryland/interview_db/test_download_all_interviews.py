@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# Copyright 2025 ncsuandrew12
+# Modifications Copyright to their individual contributors
+# Licensed under the MIT License
+# SPDX-License-Identifier: MIT
+"""
+Tests for download_all_interviews.py
+
+Each test runs the downloader against a stub HTTP server on a free local port,
+which serves a few fake interview pages and records every request it receives.
+
+Usage:
+    python -m unittest test_download_all_interviews
+
+Dependencies:
+    None beyond the Python standard library
+
+Author: ncsuandrew12
+License: MIT
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import download_all_interviews as tidbd
+
+class StubSite:
+    """
+    Stub of the interview site, served from a background thread.
+
+    Attributes:
+        pages (dict): Interview id to the page body
+        failures (dict): Interview id to the number of 503 responses to send before the page
+        delay (float): Seconds each response is held back, so overlapping requests can be observed
+        requests (list[tuple]): (monotonic time, interview id, request headers) of every request
+        in_flight (int): Requests currently being handled
+        max_in_flight (int): Most requests ever handled at once
+        lock (threading.Lock): Guards the request log and in-flight counts
+        server (ThreadingHTTPServer): The HTTP server
+    """
+    pages = None
+    failures = None
+    delay = None
+    requests = None
+    in_flight = None
+    max_in_flight = None
+    lock = None
+    server = None
+
+    def __init__(self, pages, failures=None, delay=0):
+        self.pages = pages
+        self.failures = dict(failures or {})
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/intvmain.php?i={{id}}"
+
+    def ids_requested(self):
+        return [interview_id for _, interview_id, _ in self.requests]
+
+    def handle(self, handler):
+        interview_id = int(parse_qs(urlparse(handler.path).query)["i"][0])
+        with self.lock:
+            self.requests.append((time.monotonic(), interview_id, dict(handler.headers)))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if self.failures.get(interview_id):
+                self.failures[interview_id] -= 1
+                self.respond(handler, 503, b'')
+            elif interview_id not in self.pages:
+                self.respond(handler, 404, b'')
+            else:
+                body = self.pages[interview_id]
+                etag = f'"{hash(body)}"'
+                if handler.headers.get("If-None-Match") == etag:
+                    self.respond(handler, 304, b'', {"ETag": etag})
+                else:
+                    self.respond(handler, 200, body, {"ETag": etag})
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def respond(self, handler, status, body, headers=None):
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def interview_page(interview_id):
+    return f'<html><ul class="intv-entry-list"><li>Interview {interview_id}</li></ul></html>'.encode('utf-8')
+
+class DownloadAllInterviewsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.site = None
+        self.syncs = 0
+
+    def tearDown(self):
+        if self.site:
+            self.site.close()
+        self.tmp.cleanup()
+
+    def sync(self, highest_id=None, **overrides):
+        """
+        Run one sync against the stub site.
+
+        Args:
+            highest_id (int): Highest interview id to record as known before the sync
+            **overrides: Command line arguments to change from the test defaults
+
+        Returns:
+            tuple: (Downloader, DownloadManifest) after the sync
+        """
+        args = argparse.Namespace(output_dir=self.tmp.name, url=self.site.url, start=1, end=None, discover=2,
+                                  rate=1000.0, burst=1, max_concurrency=1, timeout=5, retries=2, backoff=0.05,
+                                  checkpoint_every=20, force=False, user_agent="tidbd-test")
+        vars(args).update(overrides)
+        manifest = tidbd.DownloadManifest(os.path.join(self.tmp.name, "download-manifest.json"))
+        self.syncs += 1
+        manifest.sync_id = f"sync-{self.syncs}"
+        manifest.highest_id = highest_id or manifest.highest_id
+        manifest.complete = False
+        downloader = tidbd.Downloader(args, manifest)
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(downloader.sync())
+        manifest.complete = downloader.counts["failed"] == 0
+        manifest.save()
+        return downloader, manifest
+
+    def read_page(self, interview_id):
+        with open(os.path.join(self.tmp.name, f"{interview_id}.html"), 'rb') as f:
+            return f.read()
+
+    def test_downloads_pages(self):
+        self.site = StubSite({i: interview_page(i) for i in (1, 2, 4)})
+        downloader, manifest = self.sync(end=4)
+        self.assertEqual(downloader.counts["new"], 3)
+        self.assertEqual(downloader.counts["missing"], 1)
+        for i in (1, 2, 4):
+            self.assertEqual(self.read_page(i), interview_page(i))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "3.html")))
+        with open(os.path.join(self.tmp.name, "download-manifest.json"), 'r', encoding='utf-8') as f:
+            pages = json.load(f)["pages"]
+        self.assertTrue(pages["3"]["missing"])
+        self.assertEqual(pages["1"]["etag"], f'"{hash(interview_page(1))}"')
+        self.assertTrue(all(headers["User-Agent"] == "tidbd-test" for _, _, headers in self.site.requests))
+
+    def test_page_without_interview_is_missing(self):
+        self.site = StubSite({1: interview_page(1), 2: b'<html>No such interview</html>'})
+        downloader, _ = self.sync(end=2)
+        self.assertEqual(downloader.counts["missing"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "2.html")))
+
+    def test_second_sync_is_conditional(self):
+        self.site = StubSite({i: interview_page(i) for i in (1, 2)})
+        self.sync(end=2)
+        self.site.pages[2] = interview_page(2) + b'<!-- edited -->'
+        self.site.requests.clear()
+        downloader, _ = self.sync(end=2)
+        self.assertEqual(downloader.counts["unchanged"], 1)
+        self.assertEqual(downloader.counts["changed"], 1)
+        self.assertTrue(all("If-None-Match" in headers for _, _, headers in self.site.requests))
+        self.assertEqual(self.read_page(2), self.site.pages[2])
+
+    def test_discovers_new_interviews(self):
+        self.site = StubSite({i: interview_page(i) for i in range(1, 6)})
+        _, manifest = self.sync(highest_id=2, end=None, discover=2)
+        self.assertEqual(manifest.highest_id, 5)
+        # Windows of two ids are probed above the highest found so far until one is entirely missing:
+        # 3-4, 5-6, then 6-7, where 6 was already checked in this sync
+        self.assertEqual(sorted(self.site.ids_requested()), list(range(1, 8)))
+        for i in range(1, 6):
+            self.assertEqual(self.read_page(i), interview_page(i))
+
+    def test_retries_with_backoff(self):
+        self.site = StubSite({1: interview_page(1)}, failures={1: 2})
+        downloader, _ = self.sync(end=1, retries=2, backoff=0.1)
+        self.assertEqual(downloader.counts["new"], 1)
+        times = [t for t, _, _ in self.site.requests]
+        self.assertEqual(len(times), 3)
+        # The delay before retry n is at least backoff * 2 ** n
+        self.assertGreaterEqual(times[1] - times[0], 0.1)
+        self.assertGreaterEqual(times[2] - times[1], 0.2)
+
+    def test_gives_up_after_retries(self):
+        self.site = StubSite({1: interview_page(1), 2: interview_page(2)}, failures={1: 10})
+        downloader, manifest = self.sync(end=2, retries=2, backoff=0.01)
+        self.assertEqual(downloader.counts["failed"], 1)
+        self.assertEqual(downloader.counts["new"], 1)
+        self.assertEqual(self.site.ids_requested().count(1), 3)
+        self.assertFalse(manifest.complete)
+        self.assertNotIn("1", manifest.pages)
+
+    def test_rate_limit(self):
+        self.site = StubSite({i: interview_page(i) for i in range(1, 7)})
+        self.sync(end=6, rate=20.0, burst=1, max_concurrency=4)
+        times = sorted(t for t, _, _ in self.site.requests)
+        self.assertEqual(len(times), 6)
+        # Five intervals at 20 requests per second, with some slack for timer resolution
+        self.assertGreaterEqual(times[-1] - times[0], 5 / 20 * 0.9)
+
+    def test_concurrency_limit(self):
+        self.site = StubSite({i: interview_page(i) for i in range(1, 9)}, delay=0.05)
+        self.sync(end=8, max_concurrency=2)
+        self.assertEqual(self.site.max_in_flight, 2)
+        self.site.requests.clear()
+        self.site.max_in_flight = 0
+        self.sync(end=8, max_concurrency=1, force=True)
+        self.assertEqual(self.site.max_in_flight, 1)
+
+if __name__ == "__main__":
+    unittest.main()
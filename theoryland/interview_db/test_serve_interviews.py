@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# Copyright 2025 ncsuandrew12
+# Modifications Copyright to their individual contributors
+# Licensed under the Open Software License version 3.0
+# SPDX-License-Identifier: OSL-3.0
+"""
+Tests for serve_interviews.py
+
+Each test starts the API server on a free local port over a small archive
+written with the converter, and talks to it over raw HTTP/1.1 connections.
+
+Usage:
+    python -m unittest test_serve_interviews
+
+Dependencies:
+    - beautifulsoup4, markdownify: Required by convert_all_interviews.py
+
+Author: ncsuandrew12
+License: OSSL-3.0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from datetime import datetime
+
+import convert_all_interviews as tidbc
+import serve_interviews as tidbs
+
+def make_interview(id, year, entry_type, reporter, entries):
+    """
+    Build an interview for the test archive.
+
+    Args:
+        id (int): Interview id
+        year (int): Year of the interview date
+        entry_type (str): Interview type
+        reporter (str): Reporter
+        entries (list[tuple]): (content, tags) of each entry
+
+    Returns:
+        Interview: The interview
+    """
+    interview = tidbc.Interview()
+    interview.id = id
+    interview.title = f"Interview {id}"
+    interview.date = datetime(year, 3, 1)
+    interview.entryType = entry_type
+    interview.reporter = reporter
+    interview.entries = [tidbc.InterviewEntry(content, tags) for content, tags in entries]
+    interview.entryCount = len(interview.entries)
+    return interview
+
+class ServeInterviewsTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        archive_path = os.path.join(self.tmp.name, "archive.json")
+        interviews = {str(i.id): i for i in (
+            make_interview(1, 2005, "Signing", "Terez", [("First answer", ["Rand"]), ("Second answer", [])]),
+            make_interview(2, 2010, "Signing", "Linda", [("Third answer", ["Rand", "Mat"])]),
+            make_interview(3, 2010, "Interview", "Terez", [("Fourth answer", [])]),
+        )}
+        tidbc.write_json_archive(archive_path, os.path.join(self.tmp.name, "archive.offsets.json"), interviews)
+        args = argparse.Namespace(archive_path=archive_path, cache_size=8, reload_interval=0)
+        self.server = tidbs.InterviewServer(args)
+        self.listener = await asyncio.start_server(self.server.handle, "127.0.0.1", 0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.listener.close()
+        await self.listener.wait_closed()
+        self.tmp.cleanup()
+
+    async def exchange(self, *requests):
+        """
+        Send requests over one connection and read a response to each.
+
+        Args:
+            *requests (bytes): Raw requests, sent together
+
+        Returns:
+            list[tuple]: (status, headers, body) of each response
+        """
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(b"".join(requests))
+        await writer.drain()
+        responses = []
+        try:
+            for _ in requests:
+                status_line = await asyncio.wait_for(reader.readline(), 5)
+                if not status_line:
+                    break
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode('latin-1')
+                    if line in ("\r\n", ""):
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers["content-length"]))
+                responses.append((int(status_line.split()[1]), headers, body))
+        finally:
+            writer.close()
+        return responses
+
+    async def get(self, target, extra=b""):
+        responses = await self.exchange(b"GET " + target.encode('ascii') + b" HTTP/1.1\r\nHost: test\r\n" + extra + b"\r\n")
+        return responses[0]
+
+    async def test_list_all_interviews(self):
+        status, _, body = await self.get("/interviews")
+        self.assertEqual(status, 200)
+        summaries = json.loads(body)
+        self.assertEqual([s["id"] for s in summaries], [1, 2, 3])
+        self.assertNotIn("entries", summaries[0])
+
+    async def test_filters(self):
+        _, _, body = await self.get("/interviews?year=2010&entryType=Signing")
+        self.assertEqual([s["id"] for s in json.loads(body)], [2])
+        _, _, body = await self.get("/interviews?reporter=Terez")
+        self.assertEqual([s["id"] for s in json.loads(body)], [1, 3])
+        _, _, body = await self.get("/interviews?tag=Rand")
+        self.assertEqual([s["id"] for s in json.loads(body)], [1, 2])
+        _, _, body = await self.get("/interviews?tag=Nobody")
+        self.assertEqual(json.loads(body), [])
+
+    async def test_unknown_filter(self):
+        status, _, _ = await self.get("/interviews?colour=red")
+        self.assertEqual(status, 400)
+
+    async def test_interview_and_entry(self):
+        status, _, body = await self.get("/interviews/1")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["entryCount"], 2)
+        status, _, body = await self.get("/interviews/1/entries/2")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {"interview": 1, "entry": 2, "content": "Second answer"})
+
+    async def test_not_found(self):
+        for target in ("/interviews/99", "/interviews/1/entries/3", "/interviews/1/entries/0", "/nowhere"):
+            status, _, body = await self.get(target)
+            self.assertEqual(status, 404, target)
+            self.assertIn("error", json.loads(body))
+
+    async def test_non_ascii_digit_id(self):
+        status, _, _ = await self.get("/interviews/%C2%B2")
+        self.assertEqual(status, 404)
+        status, _, _ = await self.get("/interviews/1/entries/%C2%B2")
+        self.assertEqual(status, 404)
+
+    async def test_etag(self):
+        status, headers, _ = await self.get("/interviews/2")
+        self.assertEqual(status, 200)
+        tag = headers["etag"]
+        status, headers, body = await self.get("/interviews/2", f"If-None-Match: {tag}\r\n".encode('latin-1'))
+        self.assertEqual(status, 304)
+        self.assertEqual(headers["etag"], tag)
+        status, _, _ = await self.get("/interviews/2", b'If-None-Match: "stale"\r\n')
+        self.assertEqual(status, 200)
+        _, headers, _ = await self.get("/interviews/3")
+        self.assertNotEqual(headers["etag"], tag)
+
+    async def test_method_not_allowed_keeps_connection_usable(self):
+        # A body that would be a valid request if it were parsed as one
+        body = b"GET /nowhere HTTP/1.1\r\n\r\n"
+        post = b"POST /interviews/1 HTTP/1.1\r\nHost: test\r\nContent-Length: " + str(len(body)).encode('ascii') + b"\r\n\r\n" + body
+        get = b"GET /interviews/3 HTTP/1.1\r\nHost: test\r\n\r\n"
+        responses = await self.exchange(post, get)
+        self.assertEqual([status for status, _, _ in responses], [405, 200])
+        self.assertEqual(json.loads(responses[1][2])["id"], 3)
+
+    async def test_head(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(b"HEAD /interviews/1 HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n")
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        self.assertTrue(head.startswith(b"HTTP/1.1 200"))
+        self.assertEqual(body, b"")
+
+if __name__ == "__main__":
+    unittest.main()